@@ -3,19 +3,66 @@
 from __future__ import annotations
 
 import logging
+import re
 
+from wittiot import SubSensorname
+
+from homeassistant.components import webhook
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_WEBHOOK_ID, Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.const import CONF_HOST
-from .const import DOMAIN, CONF_VERSION
-from .coordinator import EcowittDataUpdateCoordinator
+from .const import DOMAIN, CONF_VERSION, ENTRY_MINOR_VERSION
+from .coordinator import EcowittDataUpdateCoordinator, async_remove_snapshot
+from .entity_table import async_remove_other_mode_entities
+from .push import async_notify_push_path, async_register_push_webhook
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 
 PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.SWITCH, Platform.UPDATE]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# Sub-devices used to be registered as devices of their own, identified by
+# their sub-sensor type name.
+_LEGACY_SUB_DEVICE = re.compile("|".join(map(re.escape, SubSensorname.prefixes)))
+
+
+@callback
+def _async_remove_legacy_sub_devices(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """删除旧的子设备"""
+    device_reg = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_reg, entry.entry_id):
+        if any(
+            domain == DOMAIN
+            and isinstance(value, str)
+            and _LEGACY_SUB_DEVICE.search(value)
+            for domain, value in device.identifiers
+        ):
+            device_reg.async_remove_device(device.id)
+            _LOGGER.debug("Old sub device %s removed successfully", device.id)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration's services."""
+    async_setup_services(hass)
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    if entry.version > 1:
+        return False
+    if entry.minor_version < 2:
+        _async_remove_legacy_sub_devices(hass, entry)
+    hass.config_entries.async_update_entry(entry, minor_version=ENTRY_MINOR_VERSION)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Ecowitt Official Integration from a config entry."""
@@ -24,11 +71,31 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass,
         entry,
     )
-
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.scheduler.async_register(coordinator))
+
+    if await coordinator.async_restore_snapshot():
+        # Build entities from the last known payload right away and let the
+        # gateway catch up in the background instead of blocking setup. The
+        # entities stay unavailable until that poll has checked the MAC.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"ecowitt first refresh {entry.entry_id}"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+    coordinator.firmware.async_start()
+    entry.async_on_unload(coordinator.firmware.async_stop)
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
+    if coordinator.push_mode:
+        if CONF_WEBHOOK_ID not in entry.data:
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_WEBHOOK_ID: webhook.async_generate_id()}
+            )
+            await async_notify_push_path(hass, entry)
+        entry.async_on_unload(async_register_push_webhook(hass, coordinator))
+
+    async_remove_other_mode_entities(hass, entry, coordinator.compact_mode)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # 注册重新加载函数
@@ -47,6 +114,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted payload when a config entry is deleted."""
+    await async_remove_snapshot(hass, entry.entry_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry when configuration changes."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -3,20 +3,19 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
     BinarySensorDeviceClass,
 )
-import dataclasses
-from typing import Any, Final
-from wittiot import MultiSensorInfo, WittiotDataTypes
+from typing import Final
+from wittiot import WittiotDataTypes
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
-    CONF_HOST,
     EntityCategory,
+    Platform,
 )
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
-from .coordinator import EcowittDataUpdateCoordinator
+from .coordinator import EcowittDataUpdateCoordinator, iot_context
+from .entity_table import async_setup_discovery
 
 BINARYSENSOR_DESCRIPTIONS = (
     BinarySensorEntityDescription(
@@ -64,130 +63,9 @@ async def async_setup_entry(
 ) -> None:
     """设置二进制传感器平台."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-
-    # 添加普通传感器
-    registered_main: set[str] = set()
-    async_add_entities(
-        MainDevEcowittBinarySensor(coordinator, entry.unique_id, desc)
-        for desc in BINARYSENSOR_DESCRIPTIONS
-        if desc.key in coordinator.data
+    async_setup_discovery(
+        coordinator, entry, Platform.BINARY_SENSOR, async_add_entities
     )
-    for desc in BINARYSENSOR_DESCRIPTIONS:
-        if desc.key in coordinator.data:
-            registered_main.add(desc.key)
-
-    # Subdevice Data
-    binary_sensors: list[SubDevEcowittBinarySensor] = []
-    registered_sub: set[str] = set()
-    for key in coordinator.data:
-        if key in MultiSensorInfo.SENSOR_INFO and MultiSensorInfo.SENSOR_INFO[key][
-            "data_type"
-        ] in (WittiotDataTypes.LEAK, WittiotDataTypes.BATTERY_BINARY):
-            mapping = LEAK_DETECTION_SENSOR[
-                MultiSensorInfo.SENSOR_INFO[key]["data_type"]
-            ]
-            description = dataclasses.replace(
-                mapping,
-                key=key,
-                name=MultiSensorInfo.SENSOR_INFO[key]["name"],
-            )
-            binary_sensors.append(
-                SubDevEcowittBinarySensor(
-                    coordinator,
-                    entry.unique_id,
-                    MultiSensorInfo.SENSOR_INFO[key]["dev_type"],
-                    description,
-                )
-            )
-            registered_sub.add(key)
-    async_add_entities(binary_sensors)
-
-    if "iot_list" in coordinator.data:
-        iot_sensors: list[IotDeviceBinarySensor] = []
-        desc_map = {desc.key: desc for desc in IOT_BINARYSENSOR_DESCRIPTIONS}
-        iot_data = coordinator.data["iot_list"]
-        commands = iot_data["command"]
-        registered_iot: set[str] = set()
-        for i, item in enumerate(commands):
-            nickname = item.get("nickname")
-            if nickname is None:
-                continue
-            for key in list(item):
-                if key in desc_map:
-                    desc = desc_map[key]
-                    device_desc = dataclasses.replace(
-                        desc,
-                        key=f"{nickname}_{desc.key}",
-                        # name=f"{device_info.get('name', f'设备 {device_id}')} {desc.name}",
-                    )
-                    # 添加到实体列表
-                    iot_sensors.append(
-                        IotDeviceBinarySensor(
-                            coordinator=coordinator,
-                            device_id=nickname,
-                            description=device_desc,
-                            unique_id=entry.unique_id,
-                        )
-                    )
-                    registered_iot.add(f"{nickname}_{desc.key}")
-        async_add_entities(iot_sensors)
-    else:
-        registered_iot = set()
-    async def _process_new_data() -> None:
-        new_entities: list[BinarySensorEntity] = []
-        for desc in BINARYSENSOR_DESCRIPTIONS:
-            if desc.key in coordinator.data and desc.key not in registered_main:
-                new_entities.append(MainDevEcowittBinarySensor(coordinator, entry.unique_id, desc))
-                registered_main.add(desc.key)
-        for key in coordinator.data:
-            if key in MultiSensorInfo.SENSOR_INFO:
-                info = MultiSensorInfo.SENSOR_INFO[key]
-                if info["data_type"] in (WittiotDataTypes.LEAK, WittiotDataTypes.BATTERY_BINARY):
-                    if key not in registered_sub:
-                        mapping = LEAK_DETECTION_SENSOR[info["data_type"]]
-                        description = dataclasses.replace(
-                            mapping,
-                            key=key,
-                            name=info["name"],
-                        )
-                        new_entities.append(
-                            SubDevEcowittBinarySensor(
-                                coordinator,
-                                entry.unique_id,
-                                info["dev_type"],
-                                description,
-                            )
-                        )
-                        registered_sub.add(key)
-        if "iot_list" in coordinator.data:
-            desc_map = {desc.key: desc for desc in IOT_BINARYSENSOR_DESCRIPTIONS}
-            iot_data = coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                for key in list(item):
-                    if key in desc_map:
-                        desc = desc_map[key]
-                        composed_key = f"{nickname}_{desc.key}"
-                        if composed_key not in registered_iot:
-                            device_desc = dataclasses.replace(
-                                desc,
-                                key=composed_key,
-                            )
-                            new_entities.append(
-                                IotDeviceBinarySensor(
-                                    coordinator=coordinator,
-                                    device_id=nickname,
-                                    description=device_desc,
-                                    unique_id=entry.unique_id,
-                                )
-                            )
-                            registered_iot.add(composed_key)
-        if new_entities:
-            async_add_entities(new_entities)
-    coordinator.async_add_listener(lambda: hass.async_create_task(_process_new_data()))
 
 
 class MainDevEcowittBinarySensor(
@@ -205,21 +83,14 @@ class MainDevEcowittBinarySensor(
         description: BinarySensorEntityDescription,
     ) -> None:
         """初始化漏水检测传感器."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.key)
 
         # 设置设备信息
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_name}")},
-            manufacturer="Ecowitt",
-            name=f"{device_name}",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
-        )
+        self._attr_device_info = coordinator.device_info()
 
         # 设置唯一ID和实体描述
         self._attr_unique_id = f"{device_name}_{description.key}"
         self.entity_description = description
-        self._sensor_key = description.key  # 存储用于数据访问的键
 
     @property
     def is_on(self) -> bool | None:
@@ -233,15 +104,7 @@ class MainDevEcowittBinarySensor(
     @property
     def available(self) -> bool:
         """实体是否可用"""
-        return super().available and self._sensor_key in self.coordinator.data
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return entity specific state attributes."""
-        last_seen = self.coordinator.data.get("_last_seen")
-        if last_seen is not None:
-            return {"last_seen": last_seen}
-        return None
+        return super().available and self.entity_description.key in self.coordinator.data
 
 
 class SubDevEcowittBinarySensor(
@@ -260,19 +123,12 @@ class SubDevEcowittBinarySensor(
         description: BinarySensorEntityDescription,
     ) -> None:
         """初始化漏水检测传感器."""
-        super().__init__(coordinator)
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_name}")},
-            manufacturer="Ecowitt",
-            name=f"{device_name}",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
-        )
+        super().__init__(coordinator, context=description.key)
+        self._attr_device_info = coordinator.device_info()
 
         # 设置唯一ID和实体描述
         self._attr_unique_id = f"{device_name}_{description.key}"
         self.entity_description = description
-        self._sensor_key = description.key  # 存储用于数据访问的键
 
     @property
     def is_on(self) -> bool | None:
@@ -286,15 +142,7 @@ class SubDevEcowittBinarySensor(
     @property
     def available(self) -> bool:
         """实体是否可用"""
-        return super().available and self._sensor_key in self.coordinator.data
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return entity specific state attributes."""
-        last_seen = self.coordinator.data.get("_last_seen")
-        if last_seen is not None:
-            return {"last_seen": last_seen}
-        return None
+        return super().available and self.entity_description.key in self.coordinator.data
 
 
 class IotDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
@@ -310,42 +158,19 @@ class IotDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
         unique_id: str,
     ) -> None:
         """初始化 IoT 设备传感器"""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=iot_context(device_id))
         self.device_id = device_id
         self.entity_description = description
         self._attr_unique_id = f"{device_id}_{description.key}"
 
         # 设置设备信息
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_id}")},
-            name=f"{device_id}",
-            manufacturer="Ecowitt",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
-            via_device=(DOMAIN, unique_id),
-        )
+        self._attr_device_info = coordinator.device_info(device_id)
+        self._record_key = description.key[len(device_id) + 1 :]
 
     @property
     def is_on(self) -> bool | None:
         """返回二进制传感器状态 (True 表示检测到漏水)."""
-        """获取传感器值"""
-        # # 从协调器获取设备数据
-        if "iot_list" in self.coordinator.data:
-            iot_data = self.coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                if nickname == self.device_id:
-                    key = self.entity_description.key.split("_", 1)[1]
-                    return item.get(key, None)
-        return None  # 如果数据不可用返回None
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return entity specific state attributes."""
-        last_seen = self.coordinator.data.get("_last_seen")
-        if last_seen is not None:
-            return {"last_seen": last_seen}
-        return None
+        item = self.coordinator.iot_by_nickname.get(self.device_id)
+        if item is None:
+            return None  # 如果数据不可用返回None
+        return item.get(self._record_key)
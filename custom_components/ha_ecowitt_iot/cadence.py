@@ -0,0 +1,213 @@
+"""Learn when the gateway refreshes its readings to time polls just after."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Sequence
+from itertools import islice
+import math
+from typing import NamedTuple
+
+# Changes kept per key. Each is a bracket: the value changed after the
+# previous poll started and before the poll that saw it completed. Poll
+# times, and so the scheduling lag, never stand in for the change itself.
+CADENCE_HISTORY = 16
+
+# Brackets needed before a key's period is fitted.
+CADENCE_MIN_CHANGES = 8
+
+# A reading that did not move between two packets hides a refresh, so two
+# consecutive changes may be several periods apart; at most this many on
+# average are considered.
+CADENCE_MAX_CYCLES_PER_INTERVAL = 4
+
+# The fit is only followed while the time of the targeted refresh is known to
+# within this fraction of the period. Polls locked to the refresh all see it
+# at the same offset and narrow the fit no further, so as older brackets age
+# out it loosens, polling falls back to the configured interval for a while
+# and the brackets gained at random offsets re-lock it.
+CADENCE_PHASE_TOLERANCE = 0.15
+
+# Keys refreshing slower than this do not steer polling.
+CADENCE_MAX_PERIOD_SECONDS = 600.0
+
+# Poll this long after the expected refresh so the packet has been processed.
+CADENCE_LAG_SECONDS = 1.0
+
+# Bounds on the delay, as multiples of the configured update interval; the
+# gateway is never polled more often than the user configured.
+CADENCE_MIN_FACTOR = 1.0
+CADENCE_MAX_FACTOR = 6.0
+
+
+class _Fit(NamedTuple):
+    """Refresh period and the time of the refresh in the newest bracket."""
+
+    period: float
+    # Half the width of the range of periods consistent with the brackets.
+    spread: float
+    earliest: float
+    latest: float
+
+    def window(self, cycles: int) -> tuple[float, float]:
+        """Return the earliest and latest time of a refresh cycles later."""
+        return (
+            self.earliest + cycles * (self.period - self.spread),
+            self.latest + cycles * (self.period + self.spread),
+        )
+
+
+def _solve(
+    brackets: Sequence[tuple[float, float]], cycles: Sequence[int]
+) -> _Fit | None:
+    """Fit brackets whose refresh is known by number, if they agree."""
+    # Refresh n happens at phase + n * period and must fall inside its
+    # bracket; eliminating the phase bounds the period pairwise.
+    shortest, longest = 0.0, math.inf
+    for index, ((lo, hi), cycle) in enumerate(zip(brackets, cycles)):
+        for (earlier_lo, earlier_hi), earlier in islice(zip(brackets, cycles), index):
+            apart = cycle - earlier
+            shortest = max(shortest, (lo - earlier_hi) / apart)
+            longest = min(longest, (hi - earlier_lo) / apart)
+        if shortest > longest:
+            return None
+    last = cycles[-1]
+    # The refresh in the newest bracket comes earliest with the shortest
+    # period and latest with the longest.
+    return _Fit(
+        (shortest + longest) / 2,
+        (longest - shortest) / 2,
+        max(lo + (last - n) * shortest for (lo, _), n in zip(brackets, cycles)),
+        min(hi + (last - n) * longest for (_, hi), n in zip(brackets, cycles)),
+    )
+
+
+def _number(brackets: Sequence[tuple[float, float]]) -> list[int] | None:
+    """Number the refreshes behind brackets not yet fitted.
+
+    The longest period consistent with all brackets wins; its divisors
+    always fit too.
+    """
+    mids = [(lo + hi) / 2 for lo, hi in brackets]
+    span = mids[-1] - mids[0]
+    count = len(brackets)
+    for total in range(count - 1, (count - 1) * CADENCE_MAX_CYCLES_PER_INTERVAL + 1):
+        guess = span / total
+        if guess > CADENCE_MAX_PERIOD_SECONDS:
+            continue
+        cycles = [0]
+        for earlier, later in zip(mids, mids[1:]):
+            cycles.append(cycles[-1] + max(round((later - earlier) / guess), 1))
+        if _solve(brackets, cycles) is not None:
+            return cycles
+    return None
+
+
+class _KeyCadence:
+    __slots__ = ("brackets", "cycles", "fit")
+
+    def __init__(self) -> None:
+        self.brackets: deque[tuple[float, float]] = deque(maxlen=CADENCE_HISTORY)
+        # Number of the refresh behind each bracket, once fitted.
+        self.cycles: deque[int] = deque(maxlen=CADENCE_HISTORY)
+        self.fit: _Fit | None = None
+
+    def add(self, lo: float, hi: float) -> None:
+        if (fit := self.fit) is None:
+            self.brackets.append((lo, hi))
+            if len(self.brackets) >= CADENCE_MIN_CHANGES and (
+                cycles := _number(self.brackets)
+            ):
+                self.cycles.extend(cycles)
+                self.fit = _solve(self.brackets, self.cycles)
+            return
+        # Brackets are only numbered by the fit from here on, which stays
+        # reliable across the long gaps between narrow brackets.
+        first = max(math.floor((lo - fit.latest) / (fit.period + fit.spread)), 1)
+        last = max(math.ceil((hi - fit.earliest) / (fit.period - fit.spread)), first)
+        matches = [
+            cycles
+            for cycles in range(first, last + 1)
+            if (window := fit.window(cycles))[0] < hi and window[1] > lo
+        ]
+        if len(matches) > 1:
+            # Too wide to tell which refresh it saw.
+            return
+        if matches:
+            self.brackets.append((lo, hi))
+            self.cycles.append(self.cycles[-1] + matches[0])
+            self.fit = _solve(self.brackets, self.cycles)
+        if not matches or self.fit is None:
+            # The cadence changed; start over from this change.
+            self.brackets.clear()
+            self.cycles.clear()
+            self.brackets.append((lo, hi))
+            self.fit = None
+
+    def next_refresh(self, after: float) -> float | None:
+        """Return the latest time the first refresh after a moment can happen.
+
+        Returns None if that refresh cannot be placed precisely enough.
+        """
+        if (fit := self.fit) is None:
+            return None
+        cycles = max(math.ceil((after - fit.latest) / fit.period), 1)
+        earliest, latest = fit.window(cycles)
+        if latest - earliest > fit.period * CADENCE_PHASE_TOLERANCE:
+            return None
+        return latest
+
+
+class RefreshCadenceEstimator:
+    """Estimate per-key refresh period and phase from consecutive payload diffs."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._keys: dict[str, _KeyCadence] = {}
+        self._last_start: float | None = None
+
+    def record(self, start: float, end: float, changed: Iterable[object]) -> None:
+        """Record the keys whose value changed in the poll run from start to end."""
+        if self._last_start is not None:
+            for key in changed:
+                if not isinstance(key, str) or key.startswith("_"):
+                    continue
+                if (cadence := self._keys.get(key)) is None:
+                    cadence = self._keys[key] = _KeyCadence()
+                cadence.add(self._last_start, end)
+        self._last_start = start
+
+    def next_delay(self, now: float, interval: float) -> float | None:
+        """Return the delay until just after the next expected refresh.
+
+        The target is the first refresh at least one configured interval
+        away. Returns None while no key's next refresh can be placed.
+        """
+        earliest_poll = now + interval * CADENCE_MIN_FACTOR - CADENCE_LAG_SECONDS
+        expected = min(
+            (
+                next_refresh
+                for cadence in self._keys.values()
+                if (next_refresh := cadence.next_refresh(earliest_poll)) is not None
+            ),
+            default=None,
+        )
+        if expected is None:
+            return None
+        delay = expected + CADENCE_LAG_SECONDS - now
+        if delay > interval * CADENCE_MAX_FACTOR:
+            # Poll in between, early enough that the poll after can still
+            # land on the refresh.
+            return min(
+                delay - interval * CADENCE_MIN_FACTOR - CADENCE_LAG_SECONDS,
+                interval * CADENCE_MAX_FACTOR,
+            )
+        return delay
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the trusted period per key for diagnostics."""
+        return {
+            key: cadence.fit.period
+            for key, cadence in self._keys.items()
+            if cadence.fit is not None
+        }
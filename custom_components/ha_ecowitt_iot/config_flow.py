@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Awaitable, Callable
 import logging
 from typing import Any
 
@@ -13,19 +14,82 @@ from wittiot.errors import WittiotError
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import aiohttp_client
 
-from .const import CONF_MAC, CONF_UPDATE_INTERVAL, DOMAIN, DEFAULT_UPDATE_INTERVAL
+from .const import (
+    CONF_COMPACT_MODE,
+    CONF_MAC,
+    CONF_PHASE_LOCK,
+    CONF_PUSH_MODE,
+    CONF_UPDATE_INTERVAL,
+    DOMAIN,
+    DEFAULT_COMPACT_MODE,
+    DEFAULT_PHASE_LOCK,
+    DEFAULT_PUSH_MODE,
+    DEFAULT_UPDATE_INTERVAL,
+    ENTRY_MINOR_VERSION,
+)
+from .coordinator import async_store_prefetch
+from .request_queue import (
+    READ_LOC_ALLINFO,
+    READ_LOC_INFO,
+    GatewayRequestQueue,
+    async_get_request_queue,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 _CONNECT_ERRORS = (WittiotError, ClientError, asyncio.TimeoutError)
 
+# Each validation read gives up after this long. The timeout starts with the
+# read's turn in the gateway's request queue, so a gateway busy serving its
+# coordinator makes the flow wait rather than fail.
+VALIDATION_TIMEOUT_SECONDS = 10
+
+
+async def _async_validation_read(
+    request_queue: GatewayRequestQueue,
+    request: Callable[[], Awaitable[dict[str, Any]]],
+    merge_key: str,
+) -> dict[str, Any]:
+    async def _timed() -> dict[str, Any]:
+        async with asyncio.timeout(VALIDATION_TIMEOUT_SECONDS):
+            return await request()
+
+    return await request_queue.async_call(_timed, merge_key=merge_key)
+
+
+async def _async_probe_gateway(
+    hass: HomeAssistant, host: str
+) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """Read the gateway's device info, then its full payload.
+
+    The per-host request queue sends one request at a time, so the reads
+    are awaited in turn. Raises one of _CONNECT_ERRORS when the device info
+    cannot be read; the payload is None when only it failed.
+    """
+    api = API(host, session=aiohttp_client.async_get_clientsession(hass))
+    request_queue = async_get_request_queue(hass, host)
+    devices = await _async_validation_read(
+        request_queue, api.request_loc_info, READ_LOC_INFO
+    )
+    try:
+        all_info = await _async_validation_read(
+            request_queue, api.request_loc_allinfo, READ_LOC_ALLINFO
+        )
+    except _CONNECT_ERRORS as error:
+        _LOGGER.debug("Reading the payload of %s failed: %s", host, error)
+        all_info = None
+    return devices, all_info
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Ecowitt Official Integration."""
 
+    MINOR_VERSION = ENTRY_MINOR_VERSION
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -33,14 +97,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         if user_input is not None:
-            api = API(
-                user_input[CONF_HOST],
-                session=aiohttp_client.async_get_clientsession(self.hass),
-            )
-
+            host = user_input[CONF_HOST]
             devices: dict[str, Any] | None = None
             try:
-                devices = await api.request_loc_info()
+                devices, all_info = await _async_probe_gateway(self.hass, host)
             except _CONNECT_ERRORS:
                 errors["base"] = "cannot_connect"
             else:
@@ -53,12 +113,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(unique_id)
                 self._abort_if_unique_id_configured()
 
-                try:
-                    all_info = await api.request_loc_allinfo()
+                mac = ""
+                if all_info:
                     mac = all_info.get("mac", "")
-                except _CONNECT_ERRORS:
-                    mac = ""
-                
+                    async_store_prefetch(self.hass, host, all_info)
+
                 entry_data = {**user_input, CONF_MAC: mac}
                 return self.async_create_entry(title=unique_id, data=entry_data)
 
@@ -69,6 +128,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(
                     CONF_UPDATE_INTERVAL, default=DEFAULT_UPDATE_INTERVAL
                 ): vol.All(int, vol.Range(min=5)),
+                vol.Optional(CONF_PUSH_MODE, default=DEFAULT_PUSH_MODE): bool,
+                vol.Optional(CONF_PHASE_LOCK, default=DEFAULT_PHASE_LOCK): bool,
+                vol.Optional(CONF_COMPACT_MODE, default=DEFAULT_COMPACT_MODE): bool,
             }),
             errors=errors,
         )
@@ -89,25 +151,18 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         errors = {}
 
         if user_input is not None:
-            api = API(
-                user_input[CONF_HOST],
-                session=aiohttp_client.async_get_clientsession(self.hass),
-            )
-
             try:
-                devices = await api.request_loc_info()
+                devices, all_info = await _async_probe_gateway(
+                    self.hass, user_input[CONF_HOST]
+                )
             except _CONNECT_ERRORS:
                 errors["base"] = "cannot_connect"
             else:
                 if not devices:
                     errors["base"] = "no_devices"
                 else:
-                    try:
-                        all_info = await api.request_loc_allinfo()
-                        new_mac = all_info.get("mac", "")
-                    except _CONNECT_ERRORS:
-                        new_mac = ""
-                    
+                    new_mac = all_info.get("mac", "") if all_info else ""
+
                     expected_mac = self.config_entry.data.get(CONF_MAC, "")
                     if expected_mac and new_mac and new_mac != expected_mac:
                         _LOGGER.warning(
@@ -127,6 +182,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                                 user_input[CONF_HOST],
                             )
                         
+                        if all_info:
+                            # The entry reloads with the new settings.
+                            async_store_prefetch(
+                                self.hass, user_input[CONF_HOST], all_info
+                            )
                         new_data = {**self.config_entry.data, **user_input, CONF_MAC: new_mac}
                         self.hass.config_entries.async_update_entry(
                             self.config_entry, data=new_data
@@ -148,6 +208,24 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
                         ),
                     ): vol.All(int, vol.Range(min=5)),
+                    vol.Optional(
+                        CONF_PUSH_MODE,
+                        default=self.config_entry.data.get(
+                            CONF_PUSH_MODE, DEFAULT_PUSH_MODE
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_PHASE_LOCK,
+                        default=self.config_entry.data.get(
+                            CONF_PHASE_LOCK, DEFAULT_PHASE_LOCK
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_COMPACT_MODE,
+                        default=self.config_entry.data.get(
+                            CONF_COMPACT_MODE, DEFAULT_COMPACT_MODE
+                        ),
+                    ): bool,
                 }
             ),
             errors=errors,
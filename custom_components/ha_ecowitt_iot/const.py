@@ -3,6 +3,19 @@
 DOMAIN = "ha_ecowitt_iot"
 CONF_VERSION = 2
 
+# Config entry minor version. 2: legacy per-sub-device registry devices removed.
+ENTRY_MINOR_VERSION = 2
+
 CONF_MAC = "mac"
 CONF_UPDATE_INTERVAL = "update_interval"
-DEFAULT_UPDATE_INTERVAL = 10
\ No newline at end of file
+DEFAULT_UPDATE_INTERVAL = 10
+CONF_PUSH_MODE = "push_mode"
+DEFAULT_PUSH_MODE = False
+CONF_PHASE_LOCK = "phase_lock"
+DEFAULT_PHASE_LOCK = False
+CONF_COMPACT_MODE = "compact_mode"
+DEFAULT_COMPACT_MODE = False
+
+# In push mode the gateway delivers live data itself; polling only remains
+# as a slow heartbeat for the IoT list and for when uploads stop arriving.
+PUSH_FALLBACK_INTERVAL_SECONDS = 300
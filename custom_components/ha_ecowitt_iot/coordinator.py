@@ -2,42 +2,107 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
 import time
 from datetime import timedelta
-from typing import Any
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
 
 from aiohttp.client_exceptions import ClientError
-from wittiot import API
+from wittiot import API, MultiSensorInfo
 from wittiot.errors import WittiotError
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_HOST, Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.translation import async_get_translations
 
-from .const import CONF_MAC, DOMAIN, CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+from .const import (
+    CONF_COMPACT_MODE,
+    CONF_MAC,
+    CONF_PHASE_LOCK,
+    CONF_PUSH_MODE,
+    DOMAIN,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_COMPACT_MODE,
+    DEFAULT_PHASE_LOCK,
+    DEFAULT_PUSH_MODE,
+    DEFAULT_UPDATE_INTERVAL,
+    PUSH_FALLBACK_INTERVAL_SECONDS,
+)
+from .cadence import RefreshCadenceEstimator
+from .entity_table import KeyRoute, platform_routes
+from .firmware import EcowittFirmwareTracker
+from .latency import GatewayLatencyStats, GatewayLatencyTracker
+from .request_queue import (
+    PRIORITY_CONTROL,
+    PRIORITY_READ,
+    READ_LOC_ALLINFO,
+    READ_LOC_INFO,
+    async_get_request_queue,
+)
+from .scheduler import async_get_poll_scheduler
+from .tiers import iot_push_tier_seconds
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# (payload key or IoT nickname, route) pairs handed to discovery listeners.
+_Routes = list[tuple[str, KeyRoute]]
+
+# Latency kinds of the requests without a merge key; see latency.py.
+_LATENCY_IOT_READ = "iot_read"
+_LATENCY_IOT_SWITCH = "iot_switch"
+
 # Transient errors tolerated via the cache-based retry path below.
 _TRANSIENT_ERRORS = (WittiotError, ClientError, asyncio.TimeoutError)
 
-# Per-request timeout. Generous so a busy single-threaded gateway has
-# room to answer; prior code had no timeout and could hang 5 min on a
-# half-dead socket (aiohttp default).
-REQUEST_TIMEOUT_SECONDS = 60
-
 # Number of consecutive failed polls tolerated before raising UpdateFailed.
 # At update_interval=10s this bounds stale-data exposure to ~20s.
 MAX_CONSECUTIVE_FAILURES = 3
 
-# Firmware metadata rarely changes; refresh at most once per hour.
-FIRMWARE_CHECK_INTERVAL_SECONDS = 3600
-
-# last_seen attribute update throttling to avoid recorder database bloat.
+# Once the tolerance above is exhausted the circuit opens: instead of full
+# polls the gateway is probed with the lightweight version/info requests,
+# backing off exponentially from the update interval up to this ceiling.
+CIRCUIT_MAX_BACKOFF_SECONDS = 600
+
+# Slack when deciding whether a full poll is due, so scheduler jitter does
+# not push it back by a whole poll.
+TIER_TOLERANCE_SECONDS = 1.0
+
+# Refresh requests (firmware installs, automations) arriving within this
+# window of the first one are served by a single fetch.
+REFRESH_COALESCE_WINDOW_SECONDS = 0.5
+
+# The payload read while validating a gateway in the config or options flow
+# replaces the fetch of the entry's first poll if used within this time; the
+# poll itself still runs and checks the payload.
+DATA_PREFETCH = f"{DOMAIN}_prefetch"
+PREFETCH_MAX_AGE_SECONDS = 60
+
+# After an IoT control command the device's record is re-read until it
+# reports the commanded state, starting this soon and backing off up to the
+# maximum, until the deadline.
+IOT_CONFIRM_INITIAL_DELAY = 0.2
+IOT_CONFIRM_MAX_DELAY = 2.0
+IOT_CONFIRM_TIMEOUT = 10.0
+
+# The last good payload is persisted so entities can be restored at boot
+# without waiting for the gateway; written at most this often.
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_INTERVAL_SECONDS = 300
+
+# The gateway's last-seen stamp is a payload key and the listener context of
+# its diagnostic entity; it only advances this often to avoid recorder bloat.
+LAST_SEEN_CONTEXT = "_last_seen"
 LAST_SEEN_INTERVAL_SECONDS = 900
 
 # Device identity check return values.
@@ -46,6 +111,107 @@ _IDENTITY_MISMATCH = "mismatch"
 _IDENTITY_UPGRADE_REJECT = "upgrade_reject"
 _IDENTITY_UPGRADE_BIND = "upgrade_bind"
 
+_MISSING = object()
+
+
+def payload_schema(
+    data: dict[str, Any], iot_records: dict[str, dict[str, Any]]
+) -> tuple[frozenset[str], dict[str, frozenset[str]]]:
+    """Return the shape of a payload: its keys and each IoT record's keys.
+
+    An IoT record's schema includes ``_online`` while the device is reachable,
+    since switches are only created for devices that are online.
+    """
+    iot_schema = {
+        nickname: frozenset(item) | ({"_online"} if item.get("rfnet_state") != 0 else set())
+        for nickname, item in iot_records.items()
+    }
+    return frozenset(data), iot_schema
+
+
+def _snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the persisted payload of a removed config entry."""
+    await _snapshot_store(hass, entry_id).async_remove()
+
+
+@callback
+def async_store_prefetch(hass: HomeAssistant, host: str, payload: dict[str, Any]) -> None:
+    """Keep a payload read by a config flow for the entry it sets up."""
+    hass.data.setdefault(DATA_PREFETCH, {})[host] = (time.monotonic(), payload)
+
+
+@callback
+def _async_pop_prefetch(hass: HomeAssistant, host: str) -> dict[str, Any] | None:
+    stored = hass.data.get(DATA_PREFETCH, {}).pop(host, None)
+    if stored is None or time.monotonic() - stored[0] > PREFETCH_MAX_AGE_SECONDS:
+        return None
+    return stored[1]
+
+
+def iot_context(nickname: str) -> tuple[str, str]:
+    """Return the listener context for entities backed by an IoT device record."""
+    return ("iot_list", nickname)
+
+
+def sub_device_context(dev_type: str) -> tuple[str, str]:
+    """Return the listener context for compact entities of a whole sub-device."""
+    return ("dev_type", dev_type)
+
+
+def _iot_records(data: dict[str, Any], field: str = "nickname") -> dict[Any, dict[str, Any]]:
+    """Index the IoT device records by ``field``; the first record wins on duplicates."""
+    iot_list = data.get("iot_list")
+    if not isinstance(iot_list, dict):
+        return {}
+    index: dict[Any, dict[str, Any]] = {}
+    for item in iot_list.get("command", []):
+        value = item.get(field)
+        if value is not None:
+            index.setdefault(value, item)
+    return index
+
+
+# Payload keys that change without the readings changing.
+_FINGERPRINT_EXCLUDED = frozenset({LAST_SEEN_CONTEXT})
+
+# Sub-device type of each sub-sensor payload key.
+_KEY_DEV_TYPE = {
+    key: info["dev_type"] for key, info in MultiSensorInfo.SENSOR_INFO.items()
+}
+
+
+def payload_fingerprint(data: dict[str, Any]) -> bytes:
+    """Return a digest identifying the readings in a payload."""
+    body = {key: val for key, val in data.items() if key not in _FINGERPRINT_EXCLUDED}
+    encoded = json.dumps(body, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+def diff_payload(old: dict[str, Any], new: dict[str, Any]) -> set[Any]:
+    """Return the listener contexts whose value differs between two payloads.
+
+    Top-level keys are compared directly; the IoT list is compared per device
+    record and reported as ``iot_context(nickname)``.
+    """
+    changed: set[Any] = {
+        key
+        for key in old.keys() | new.keys()
+        if key != "iot_list" and old.get(key, _MISSING) != new.get(key, _MISSING)
+    }
+    if old.get("iot_list") != new.get("iot_list"):
+        old_iot = _iot_records(old)
+        new_iot = _iot_records(new)
+        changed.update(
+            iot_context(nickname)
+            for nickname in old_iot.keys() | new_iot.keys()
+            if old_iot.get(nickname) != new_iot.get(nickname)
+        )
+    return changed
+
 
 class EcowittDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Define an object to hold Ecowitt data."""
@@ -59,29 +225,425 @@ class EcowittDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     ) -> None:
         """Initialize."""
         update_interval = config_entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        self.push_mode: bool = config_entry.data.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE)
+        if self.push_mode:
+            update_interval = max(update_interval, PUSH_FALLBACK_INTERVAL_SECONDS)
+        # Phase locking only makes sense when polls carry the live data.
+        self.phase_lock: bool = not self.push_mode and config_entry.data.get(
+            CONF_PHASE_LOCK, DEFAULT_PHASE_LOCK
+        )
+        # One entity per sub-device instead of one per reading.
+        self.compact_mode: bool = config_entry.data.get(
+            CONF_COMPACT_MODE, DEFAULT_COMPACT_MODE
+        )
         super().__init__(
             hass, _LOGGER, name=DOMAIN, update_interval=timedelta(seconds=update_interval)
         )
         self.config_entry = config_entry
+        self._base_interval: float = update_interval
+        self.scheduler = async_get_poll_scheduler(hass)
+        # Loop time the next poll is aimed at; see _schedule_refresh.
+        self._next_poll_at: float | None = None
         self.api = API(
             self.config_entry.data[CONF_HOST], session=async_get_clientsession(hass)
         )
+        self.request_queue = async_get_request_queue(hass, self.host)
+        self._prefetched = _async_pop_prefetch(hass, self.host)
+        self.firmware = EcowittFirmwareTracker(
+            hass, config_entry, self.api, self.request_queue
+        )
+        self._store = _snapshot_store(hass, config_entry.entry_id)
+        self._last_snapshot_save: float = 0.0
+        self.latency = GatewayLatencyStats()
+        self.cadence = RefreshCadenceEstimator()
+        # Wall time of the most recent data poll, for latency diagnostics.
+        self.last_poll_duration: float | None = None
         self._consecutive_failures = 0
         self._last_good_data: dict[str, Any] = {}
-        self._firmware_update_info: dict[str, Any] | None = None
-        self._last_firmware_check: float = 0.0
         self._outage_logged = False
+        self._circuit_open = False
+        self._probe_failures = 0
         self._mismatch_notified = False
+        # Whether a full poll has passed the identity check since setup.
+        self._identity_verified = False
         self._upgrade_bound = False
         self._last_seen_value: float = 0.0
         self._last_seen_ts: float = 0.0
+        # Wall time each sub-device (dev_type or IoT nickname) last reported a
+        # changed reading; shown by the gateway's last-seen entity.
+        self.sub_device_seen: dict[str, float] = {}
+        # Contexts changed by the pending update; None means notify everyone.
+        self._changed_keys: set[Any] | None = None
+        self._fingerprint: bytes | None = None
+        # Loop time of the last full poll; push mode re-reads only the IoT
+        # records in between (see tiers.py).
+        self._last_full_poll: float = 0.0
+        self._force_full_poll = False
+        # Fetch shared by the refresh requests of the current window.
+        self.refresh_window: float = REFRESH_COALESCE_WINDOW_SECONDS
+        self._shared_refresh: asyncio.Task[None] | None = None
+        # Successful polls, and those whose payload matched the previous one.
+        self.polls_total = 0
+        self.polls_unchanged = 0
+        # Payload shape last announced to the discovery listeners.
+        self._schema_keys: frozenset[str] = frozenset()
+        self._schema_iot: dict[str, frozenset[str]] = {}
+        self._discovery_listeners: dict[
+            Platform, list[Callable[[_Routes, _Routes], None]]
+        ] = {}
+        # Bumped whenever listeners are told data changed, so entities can
+        # compute derived values once per generation.
+        self.generation = 0
+        # DeviceInfo shared by every entity of a device, per firmware version.
+        self._device_infos: dict[tuple[str | None, Any], DeviceInfo] = {}
+        # IoT device records of the current payload, rebuilt once per update.
+        self.iot_by_nickname: dict[str, dict[str, Any]] = {}
+        self.iot_by_id: dict[Any, dict[str, Any]] = {}
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only listeners whose context changed in the last update.
+
+        Entities subscribe with their payload key (or ``iot_context``) as
+        context; listeners without a context, such as entity discovery, run
+        whenever anything changed.
+        """
+        changed = self._changed_keys
+        self._changed_keys = None
+        if changed != set():
+            self.generation += 1
+            if self.data:
+                self._async_discover()
+        if changed is None:
+            super().async_update_listeners()
+            return
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                if changed:
+                    update_callback()
+            elif context in changed:
+                update_callback()
+
+    def _index_iot(self, res: dict[str, Any]) -> None:
+        self.iot_by_nickname = _iot_records(res)
+        self.iot_by_id = _iot_records(res, "id")
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last persisted payload as current data.
+
+        Returns False when there is nothing to restore. Restored data only
+        seeds entity creation; entities stay unavailable and uploads are
+        ignored until the first live poll has fetched the full payload and
+        checked the gateway's identity.
+        """
+        snapshot = await self._store.async_load()
+        if not snapshot:
+            return False
+        self._index_iot(snapshot)
+        self.data = snapshot
+        self.last_update_success = False
+        self.generation += 1
+        return True
+
+    @callback
+    def _save_snapshot(self) -> None:
+        now = time.monotonic()
+        if now - self._last_snapshot_save < SNAPSHOT_SAVE_INTERVAL_SECONDS:
+            return
+        self._last_snapshot_save = now
+        self._store.async_delay_save(lambda: self._last_good_data)
+
+    @callback
+    def async_add_discovery_listener(
+        self,
+        platform: Platform,
+        discovery_callback: Callable[[_Routes, _Routes], None],
+    ) -> CALLBACK_TYPE:
+        """Call discovery_callback(key_routes, iot_routes) when platform gains routes.
+
+        key_routes pair payload keys not seen before with their route in the
+        entity table; iot_routes pair nicknames of IoT records that are new or
+        whose set of fields changed with theirs. Platforms without a new route
+        are not called.
+        """
+        listeners = self._discovery_listeners.setdefault(platform, [])
+        listeners.append(discovery_callback)
+
+        @callback
+        def _remove() -> None:
+            listeners.remove(discovery_callback)
+
+        return _remove
+
+    @callback
+    def _async_discover(self) -> None:
+        """Run platform discovery only when the payload schema changed."""
+        keys, iot_schema = payload_schema(self.data, self.iot_by_nickname)
+        if keys == self._schema_keys and iot_schema == self._schema_iot:
+            return
+        new_keys = set(keys - self._schema_keys)
+        new_iot = {
+            nickname
+            for nickname, schema in iot_schema.items()
+            if schema != self._schema_iot.get(nickname)
+        }
+        self._schema_keys = keys
+        self._schema_iot = iot_schema
+        if not new_keys and not new_iot:
+            return
+        keys_in_order = [key for key in self.data if key in new_keys]
+        records = [
+            (nickname, item)
+            for nickname, item in self.iot_by_nickname.items()
+            if nickname in new_iot
+        ]
+        for platform, listeners in self._discovery_listeners.items():
+            key_routes, iot_routes = platform_routes(
+                platform, keys_in_order, records, self.compact_mode
+            )
+            if not key_routes and not iot_routes:
+                continue
+            for discovery_callback in list(listeners):
+                discovery_callback(key_routes, iot_routes)
+
+    def _track_changes(self, res: dict[str, Any]) -> bool:
+        """Record which contexts the new payload changes.
+
+        Returns True when the payload is identical to the previous one, in
+        which case nothing is diffed and no listener will be called.
+        """
+        fingerprint = payload_fingerprint(res)
+        unchanged = fingerprint == self._fingerprint
+        self._fingerprint = fingerprint
+        if res.get("iot_list") is not (self.data or {}).get("iot_list"):
+            self._index_iot(res)
+        if not self.data or not self.last_update_success:
+            # First data or recovery: availability flips for every entity.
+            self._changed_keys = None
+            self._record_freshness(res)
+            return False
+        if unchanged:
+            # The last-seen stamp is not part of the fingerprint.
+            if res.get(LAST_SEEN_CONTEXT) != self.data.get(LAST_SEEN_CONTEXT):
+                self._changed_keys = {LAST_SEEN_CONTEXT}
+            else:
+                self._changed_keys = set()
+            return True
+        self._changed_keys = diff_payload(self.data, res)
+        self._record_freshness(self._changed_keys)
+        if self.compact_mode:
+            self._changed_keys |= {
+                sub_device_context(dev_type)
+                for key in self._changed_keys
+                if isinstance(key, str)
+                and (dev_type := _KEY_DEV_TYPE.get(key)) is not None
+            }
+        return False
+
+    def _record_freshness(self, changed: Any) -> None:
+        """Stamp every sub-device with a changed key (or context) as seen now."""
+        now = time.time()
+        for key in changed:
+            if isinstance(key, tuple):
+                # iot_context(nickname) or sub_device_context(dev_type)
+                self.sub_device_seen[key[1]] = now
+            elif key == "iot_list":
+                for nickname in self.iot_by_nickname:
+                    self.sub_device_seen[nickname] = now
+            elif (dev_type := _KEY_DEV_TYPE.get(key)) is not None:
+                self.sub_device_seen[dev_type] = now
 
     async def _async_update_data(self) -> dict[str, Any]:
+        start = time.monotonic()
+        try:
+            return await self._async_poll()
+        finally:
+            self.last_poll_duration = time.monotonic() - start
+            _LOGGER.debug(
+                "Ecowitt poll of %s took %.3fs",
+                self.config_entry.data[CONF_HOST],
+                self.last_poll_duration,
+            )
+            # Re-aim the next refresh at this gateway's slot in the fleet.
+            delay = self._next_poll_delay()
+            self._next_poll_at = self.hass.loop.time() + delay
+            self.update_interval = timedelta(seconds=delay)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        # The base class fires at int(loop.time()) + self._microsecond +
+        # update_interval, up to a second off the slot; aim it exactly.
+        now = self.hass.loop.time()
+        if self._next_poll_at is not None and self._next_poll_at > now:
+            self.update_interval = timedelta(
+                seconds=max(self._next_poll_at - int(now) - self._microsecond, 0)
+            )
+        super()._schedule_refresh()
+
+    def _next_poll_delay(self) -> float:
+        if self._circuit_open:
+            return min(
+                self._base_interval * 2**self._probe_failures,
+                CIRCUIT_MAX_BACKOFF_SECONDS,
+            )
+        if self.phase_lock:
+            delay = self.cadence.next_delay(self.hass.loop.time(), self._base_interval)
+            if delay is not None:
+                return delay
+        delay = self.scheduler.next_delay(self, self._base_interval)
+        if self.push_mode and self.iot_by_nickname:
+            # Live data arrives by push; keep IoT records on their own tier.
+            delay = min(delay, iot_push_tier_seconds(len(self.iot_by_nickname)))
+        return delay
+
+    async def async_request_refresh(self) -> None:
+        """Request a full poll, even where push mode would only re-read IoT records.
+
+        Callers request a refresh after changing device state (switch
+        commands, firmware installs) and expect to see the result. Requests
+        arriving within refresh_window of the first one share one fetch, and
+        every caller waits until it has finished.
+        """
+        if self._shared_refresh is None:
+            self._shared_refresh = self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_shared_refresh(),
+                f"ecowitt refresh {self.config_entry.entry_id}",
+            )
+        await asyncio.shield(self._shared_refresh)
+
+    async def _async_shared_refresh(self) -> None:
+        await asyncio.sleep(self.refresh_window)
+        # Requests from now on want data read after they were made; they
+        # start the next shared refresh instead of joining this one.
+        self._shared_refresh = None
+        self._force_full_poll = True
+        await self.async_refresh()
+
+    def _iot_only_due(self, now: float) -> bool:
+        """Return True when push mode only needs the IoT records refreshed."""
+        return (
+            self.push_mode
+            and not self._force_full_poll
+            and bool(self.data)
+            and self.last_update_success
+            and "iot_list" in self.data
+            and now - self._last_full_poll < self._base_interval - TIER_TOLERANCE_SECONDS
+        )
+
+    async def _async_poll_iot(self) -> dict[str, Any]:
+        """Refresh only the IoT device records via the per-device endpoint."""
+        iot_list = self.data["iot_list"]
+        commands = [dict(item) for item in iot_list.get("command", [])]
         try:
-            async with asyncio.timeout(REQUEST_TIMEOUT_SECONDS):
-                res: dict[str, Any] = await self.api.request_loc_allinfo()
+            await self._async_read_iot_records(commands)
         except _TRANSIENT_ERRORS as error:
             return self._handle_fetch_failure(error)
+        res = {**self.data, "iot_list": {**iot_list, "command": commands}}
+        self._last_good_data = res
+        self._track_changes(res)
+        return res
+
+    async def _async_read_iot_records(
+        self, records: Iterable[dict[str, Any]], priority: int = PRIORITY_READ
+    ) -> None:
+        """Re-read IoT device records in place, one request per device.
+
+        wittiot's update_single_device sends one read_device POST per record
+        however many it is given; passing them one at a time keeps each
+        latency sample and timeout to a single POST.
+        """
+        for record in records:
+            await self._async_request(
+                lambda record=record: self.api.update_single_device(
+                    {"command": [record]}
+                ),
+                priority=priority,
+                kind=_LATENCY_IOT_READ,
+            )
+
+    async def _async_probe(self) -> None:
+        """Check an unreachable gateway with a cheap request before polling it again."""
+        try:
+            await self._async_request(self.api.request_loc_info, READ_LOC_INFO)
+        except _TRANSIENT_ERRORS as error:
+            self._probe_failures += 1
+            raise UpdateFailed(
+                f"Gateway still unreachable (probe {self._probe_failures}): {error}"
+            ) from error
+        _LOGGER.debug(
+            "Ecowitt gateway %s answered probe; resuming full polling",
+            self.config_entry.data[CONF_HOST],
+        )
+        self._circuit_open = False
+        self._probe_failures = 0
+
+    async def _async_request(
+        self,
+        request: Callable[[], Awaitable[_T]],
+        merge_key: str | None = None,
+        priority: int = PRIORITY_READ,
+        kind: str | None = None,
+    ) -> _T:
+        """Run a gateway request under the fleet cap and the adaptive timeout.
+
+        The request waits its turn in the gateway's request queue first; the
+        timeout only covers the request itself. It follows the gateway's
+        observed latency for this kind of request, by default its merge key
+        (see latency.py); prior code had no timeout and could hang 5 min on a
+        half-dead socket (aiohttp default), then used a fixed 60 s.
+        """
+        tracker = self.latency.tracker(kind or merge_key)
+        # Control commands skip the fleet cap, so polls of other gateways
+        # cannot hold them up; the gateway's own queue still runs one request
+        # at a time, so this adds at most one request per gateway.
+        run = (
+            self._async_timed_request
+            if priority == PRIORITY_CONTROL
+            else self._async_capped_request
+        )
+        return await self.request_queue.async_call(
+            lambda: run(request, tracker), priority=priority, merge_key=merge_key
+        )
+
+    async def _async_capped_request(
+        self, request: Callable[[], Awaitable[_T]], tracker: GatewayLatencyTracker
+    ) -> _T:
+        async with self.scheduler.semaphore:
+            return await self._async_timed_request(request, tracker)
+
+    async def _async_timed_request(
+        self, request: Callable[[], Awaitable[_T]], tracker: GatewayLatencyTracker
+    ) -> _T:
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(tracker.timeout):
+                result = await request()
+        except asyncio.TimeoutError:
+            tracker.record_timeout()
+            raise
+        tracker.record(time.monotonic() - start)
+        return result
+
+    async def _async_poll(self) -> dict[str, Any]:
+        self._changed_keys = None
+        started = self.hass.loop.time()
+        if self._circuit_open:
+            await self._async_probe()
+        if self._iot_only_due(self.hass.loop.time()):
+            return await self._async_poll_iot()
+        if self._prefetched is not None:
+            # Read moments ago while the config or options flow validated
+            # the gateway; still checked and merged like a polled payload.
+            res: dict[str, Any] = self._prefetched
+            self._prefetched = None
+        else:
+            try:
+                res = await self._async_request(
+                    self.api.request_loc_allinfo, READ_LOC_ALLINFO
+                )
+            except _TRANSIENT_ERRORS as error:
+                return self._handle_fetch_failure(error)
 
         identity = self._check_device_identity(res)
         actual_mac = res.get("mac", "")
@@ -109,12 +671,11 @@ class EcowittDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 f"different device. Please update the integration configuration."
             )
 
-        res["firmware_update"] = await self._maybe_update_firmware_info()
-        now = time.time()
-        if now - self._last_seen_ts >= LAST_SEEN_INTERVAL_SECONDS:
-            self._last_seen_value = now
-            self._last_seen_ts = now
-        res["_last_seen"] = self._last_seen_value
+        self._identity_verified = True
+        # The full payload was fetched either way; keep all of it.
+        self._last_full_poll = self.hass.loop.time()
+        self._force_full_poll = False
+        self._stamp_last_seen(res)
 
         if self._outage_logged:
             _LOGGER.info(
@@ -139,8 +700,163 @@ class EcowittDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             )
         self._consecutive_failures = 0
         self._last_good_data = res
+        self._save_snapshot()
+        self.polls_total += 1
+        if self._track_changes(res):
+            self.polls_unchanged += 1
+        if self.phase_lock and self._changed_keys is not None:
+            self.cadence.record(started, self.hass.loop.time(), self._changed_keys)
         return res
 
+    def device_info(self, device_id: str | None = None) -> DeviceInfo:
+        """Return the shared DeviceInfo of the gateway, or of one of its IoT devices."""
+        ver = self.data.get("ver")
+        cache_key = (device_id, ver)
+        info = self._device_infos.get(cache_key)
+        if info is not None:
+            return info
+        gateway = self.config_entry.unique_id
+        info = DeviceInfo(
+            identifiers={(DOMAIN, f"{device_id or gateway}")},
+            manufacturer="Ecowitt",
+            name=f"{device_id or gateway}",
+            model=ver,
+            configuration_url=f"http://{self.host}",
+        )
+        if device_id is not None:
+            info["via_device"] = (DOMAIN, gateway)
+        elif mac := self.data.get("mac"):
+            # adding mac address as connection info
+            info["connections"] = {(dr.CONNECTION_NETWORK_MAC, dr.format_mac(mac))}
+        self._device_infos[cache_key] = info
+        return info
+
+    @property
+    def host(self) -> str:
+        """Return the gateway address."""
+        return self.config_entry.data[CONF_HOST]
+
+    @property
+    def circuit_open(self) -> bool:
+        """Return True while the gateway is only being probed."""
+        return self._circuit_open
+
+    @property
+    def push_passkey(self) -> str | None:
+        """Return the PASSKEY the gateway sends with its uploads (MD5 of its MAC)."""
+        mac = self.config_entry.data.get(CONF_MAC, "")
+        if not mac:
+            return None
+        return hashlib.md5(mac.upper().encode()).hexdigest().upper()
+
+    def _stamp_last_seen(self, res: dict[str, Any]) -> None:
+        now = time.time()
+        if now - self._last_seen_ts >= LAST_SEEN_INTERVAL_SECONDS:
+            self._last_seen_value = now
+            self._last_seen_ts = now
+        res[LAST_SEEN_CONTEXT] = self._last_seen_value
+
+    @callback
+    def async_handle_push(self, values: dict[str, Any]) -> None:
+        """Merge a decoded gateway upload into the current snapshot."""
+        if not self._identity_verified or self._mismatch_notified:
+            # Nothing to merge into until the first poll has established
+            # identity, the IoT list and the set of supported keys; nothing
+            # is taken from a gateway the last poll found to be another one.
+            return
+        known = {key: val for key, val in values.items() if key in self.data}
+        if not known:
+            return
+        res = {**self.data, **known}
+        self._stamp_last_seen(res)
+        self._async_set_partial_data(res)
+
+    @callback
+    def _async_set_partial_data(self, res: dict[str, Any]) -> None:
+        """Publish data gathered outside a poll.
+
+        Unlike async_set_updated_data this keeps the heartbeat poll on its
+        schedule; uploads arrive more often than the fallback interval and
+        would otherwise postpone it forever.
+        """
+        self._last_good_data = res
+        self._track_changes(res)
+        self.data = res
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    async def async_refresh_iot_devices(
+        self, nicknames: Iterable[str]
+    ) -> dict[str, dict[str, Any]]:
+        """Re-read some IoT devices' records and publish them.
+
+        Used to confirm control commands without a full poll; the reads are
+        queued as control requests so they are not stuck behind one either.
+        Returns the fresh records by nickname; unknown devices are skipped.
+        """
+        if not self.data:
+            return {}
+        records = {
+            nickname: dict(self.iot_by_nickname[nickname])
+            for nickname in nicknames
+            if nickname in self.iot_by_nickname
+        }
+        if not records:
+            return {}
+        await self._async_read_iot_records(records.values(), PRIORITY_CONTROL)
+        iot_list = self.data["iot_list"]
+        commands = [
+            records.get(item.get("nickname"), item)
+            for item in iot_list.get("command", [])
+        ]
+        self._async_set_partial_data(
+            {**self.data, "iot_list": {**iot_list, "command": commands}}
+        )
+        return records
+
+    async def async_switch_iot_device(self, nickname: str, state: bool) -> None:
+        """Switch an IoT device on or off, ahead of any queued reads."""
+        record = self.iot_by_nickname.get(nickname)
+        if record is None or record.get("rfnet_state") == 0:
+            raise HomeAssistantError(f"IoT device {nickname} is not available")
+        iot_id, model = record.get("id"), record.get("model")
+        await self._async_request(
+            lambda: self.api.switch_iotdevice(iot_id, model, 1 if state else 0),
+            priority=PRIORITY_CONTROL,
+            kind=_LATENCY_IOT_SWITCH,
+        )
+
+    async def async_confirm_iot_states(self, targets: dict[str, bool]) -> set[str]:
+        """Re-read the commanded IoT devices until they report their new state.
+
+        Each round re-reads only the devices still pending, one read_device
+        request each. Returns the nicknames that did not confirm before the
+        deadline.
+        """
+        loop = self.hass.loop
+        deadline = loop.time() + IOT_CONFIRM_TIMEOUT
+        delay = IOT_CONFIRM_INITIAL_DELAY
+        pending = dict(targets)
+        while pending:
+            await asyncio.sleep(delay)
+            try:
+                records = await self.async_refresh_iot_devices(pending)
+            except _TRANSIENT_ERRORS as error:
+                _LOGGER.debug("Confirming %s failed: %s", ", ".join(pending), error)
+                records = {}
+            for nickname, record in records.items():
+                if bool(record.get("iot_running", 0)) == pending[nickname]:
+                    del pending[nickname]
+            delay = min(delay * 2, IOT_CONFIRM_MAX_DELAY)
+            if pending and loop.time() + delay > deadline:
+                _LOGGER.debug(
+                    "%s did not report the commanded state within %ss",
+                    ", ".join(pending),
+                    IOT_CONFIRM_TIMEOUT,
+                )
+                break
+        return set(pending)
+
     def _check_device_identity(self, data: dict[str, Any]) -> str:
         """检查设备身份，纯校验无副作用，返回状态码."""
         expected_mac = self.config_entry.data.get(CONF_MAC, "")
@@ -250,10 +966,13 @@ class EcowittDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 MAX_CONSECUTIVE_FAILURES,
                 error,
             )
+            self._changed_keys = set()
             return self._last_good_data
 
-        # Tolerance exhausted: drop the cache, log once, and mark unavailable.
+        # Tolerance exhausted: drop the cache, log once, mark unavailable and
+        # fall back to backed-off probes until the gateway answers again.
         self._last_good_data = {}
+        self._circuit_open = True
         if not self._outage_logged:
             _LOGGER.warning(
                 "Ecowitt gateway %s unreachable for %d consecutive polls (%s); "
@@ -266,43 +985,3 @@ class EcowittDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         raise UpdateFailed(
             f"Gateway unreachable for {self._consecutive_failures} consecutive polls: {error}"
         ) from error
-
-    async def _maybe_update_firmware_info(self) -> dict[str, Any]:
-        # A firmware endpoint failure must not mask a successful data fetch.
-        now = time.monotonic()
-        if (
-            self._firmware_update_info is not None
-            and now - self._last_firmware_check < FIRMWARE_CHECK_INTERVAL_SECONDS
-        ):
-            return self._firmware_update_info
-
-        try:
-            async with asyncio.timeout(REQUEST_TIMEOUT_SECONDS):
-                firmware_info: dict[str, Any] = await self.api.request_firmware_update_info()
-        except _TRANSIENT_ERRORS as err:
-            _LOGGER.debug(
-                "Firmware info fetch failed; keeping previous metadata: %s", err
-            )
-            return self._firmware_update_info or {}
-
-        try:
-            async with asyncio.timeout(REQUEST_TIMEOUT_SECONDS):
-                check_info: dict[str, Any] = await self.api.request_firmware_update_check()
-        except _TRANSIENT_ERRORS as err:
-            firmware_info["check_supported"] = False
-            firmware_info["install_supported"] = False
-            firmware_info["error"] = str(err)
-        else:
-            response = check_info.get("response", {})
-            if isinstance(response, dict):
-                firmware_info["is_new"] = response.get(
-                    "is_new", firmware_info.get("is_new", False)
-                )
-                firmware_info["release_summary"] = response.get(
-                    "msg", firmware_info.get("release_summary")
-                )
-                firmware_info["check_response"] = response
-
-        self._firmware_update_info = firmware_info
-        self._last_firmware_check = now
-        return firmware_info
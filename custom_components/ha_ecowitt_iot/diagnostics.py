@@ -0,0 +1,27 @@
+"""Diagnostics support for the Ecowitt Official Integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import EcowittDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return polling statistics for a config entry."""
+    coordinator: EcowittDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "last_poll_duration": coordinator.last_poll_duration,
+        "circuit_open": coordinator.circuit_open,
+        "polls_total": coordinator.polls_total,
+        "polls_unchanged": coordinator.polls_unchanged,
+        "latency": coordinator.latency.as_dict(),
+        "request_queue": coordinator.request_queue.as_dict(),
+        "refresh_periods": coordinator.cadence.as_dict(),
+    }
@@ -0,0 +1,293 @@
+"""Precompiled routing of payload keys to platforms, entity classes and descriptions."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from wittiot import MultiSensorInfo, WittiotDataTypes
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity, EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+if TYPE_CHECKING:
+    from .coordinator import EcowittDataUpdateCoordinator
+
+_BINARY_DATA_TYPES = (WittiotDataTypes.LEAK, WittiotDataTypes.BATTERY_BINARY)
+
+
+@dataclass(frozen=True, slots=True)
+class KeyRoute:
+    """Where a payload key (or IoT record field) becomes an entity."""
+
+    platform: Platform
+    entity_class: type[Entity]
+    description: EntityDescription
+    # Sub-device type from MultiSensorInfo; None for gateway and IoT entities.
+    dev_type: str | None = None
+    # IoT entities that are only created while the device is online.
+    requires_online: bool = False
+    # Compact mode: every key of the sub-device feeds one entity per dev_type.
+    aggregate: bool = False
+
+
+@cache
+def sub_device_groups() -> dict[str, tuple[str, ...]]:
+    """Return the payload keys of each compact sub-device, its primary reading first.
+
+    The primary reading is the first non-diagnostic key wittiot lists for
+    the dev_type (temperature before humidity, PM2.5 before its averages).
+    Sub-devices with only diagnostic keys (the battery and signal of a
+    sensor array whose readings are top-level keys) have no reading to
+    show as a state and keep an entity per key.
+    """
+    from .tiers import DIAGNOSTIC_KEYS
+
+    groups: dict[str, list[str]] = {}
+    for key, info in MultiSensorInfo.SENSOR_INFO.items():
+        groups.setdefault(info["dev_type"], []).append(key)
+    return {
+        dev_type: tuple(sorted(keys, key=lambda name: name in DIAGNOSTIC_KEYS))
+        for dev_type, keys in groups.items()
+        if not DIAGNOSTIC_KEYS.issuperset(keys)
+    }
+
+
+@cache
+def key_table(compact: bool = False) -> dict[str, tuple[KeyRoute, ...]]:
+    """Return the routes of every known top-level payload key.
+
+    Built once, on first discovery rather than at import, because the
+    platform modules holding the descriptions import this module.
+    """
+    from .binary_sensor import (
+        BINARYSENSOR_DESCRIPTIONS,
+        LEAK_DETECTION_SENSOR,
+        MainDevEcowittBinarySensor,
+        SubDevEcowittBinarySensor,
+    )
+    from .sensor import (
+        ECOWITT_SENSORS_MAPPING,
+        SENSOR_DESCRIPTIONS,
+        MainDevEcowittSensor,
+        SubDevAggregateSensor,
+        SubDevEcowittSensor,
+    )
+
+    table: dict[str, list[KeyRoute]] = {}
+    for desc in SENSOR_DESCRIPTIONS:
+        table.setdefault(desc.key, []).append(
+            KeyRoute(Platform.SENSOR, MainDevEcowittSensor, desc)
+        )
+    for desc in BINARYSENSOR_DESCRIPTIONS:
+        table.setdefault(desc.key, []).append(
+            KeyRoute(Platform.BINARY_SENSOR, MainDevEcowittBinarySensor, desc)
+        )
+    if compact:
+        for dev_type, keys in sub_device_groups().items():
+            primary = keys[0]
+            route = KeyRoute(
+                Platform.SENSOR,
+                SubDevAggregateSensor,
+                replace(
+                    ECOWITT_SENSORS_MAPPING[
+                        MultiSensorInfo.SENSOR_INFO[primary]["data_type"]
+                    ],
+                    key=primary,
+                    name=dev_type,
+                ),
+                dev_type,
+                aggregate=True,
+            )
+            for key in keys:
+                table.setdefault(key, [route])
+    for key, info in MultiSensorInfo.SENSOR_INFO.items():
+        if key in table:
+            continue
+        if info["data_type"] in _BINARY_DATA_TYPES:
+            route = KeyRoute(
+                Platform.BINARY_SENSOR,
+                SubDevEcowittBinarySensor,
+                LEAK_DETECTION_SENSOR[info["data_type"]],
+                info["dev_type"],
+            )
+        else:
+            route = KeyRoute(
+                Platform.SENSOR,
+                SubDevEcowittSensor,
+                ECOWITT_SENSORS_MAPPING[info["data_type"]],
+                info["dev_type"],
+            )
+        table[key] = [route]
+    return {key: tuple(routes) for key, routes in table.items()}
+
+
+@cache
+def iot_field_table() -> dict[str, tuple[KeyRoute, ...]]:
+    """Return the routes of every known IoT device record field."""
+    from .binary_sensor import IOT_BINARYSENSOR_DESCRIPTIONS, IotDeviceBinarySensor
+    from .sensor import IOT_SENSOR_DESCRIPTIONS, IotDeviceSensor
+    from .switch import SWITCH_DESCRIPTIONS, EcowittSwitch
+
+    table: dict[str, list[KeyRoute]] = {}
+    for desc in IOT_SENSOR_DESCRIPTIONS:
+        table.setdefault(desc.key, []).append(
+            KeyRoute(Platform.SENSOR, IotDeviceSensor, desc)
+        )
+    for desc in IOT_BINARYSENSOR_DESCRIPTIONS:
+        table.setdefault(desc.key, []).append(
+            KeyRoute(Platform.BINARY_SENSOR, IotDeviceBinarySensor, desc)
+        )
+    for desc in SWITCH_DESCRIPTIONS:
+        table.setdefault(desc.key, []).append(
+            KeyRoute(Platform.SWITCH, EcowittSwitch, desc, requires_online=True)
+        )
+    return {key: tuple(routes) for key, routes in table.items()}
+
+
+# Descriptions handed out per (platform, template key, entity key), so
+# rediscovery reuses one object. An IoT field such as iot_running has
+# routes on several platforms, each with its own description.
+_INTERNED: dict[tuple[Platform, str, str], EntityDescription] = {}
+
+
+def _description(route: KeyRoute, key: str, name: str | None = None) -> EntityDescription:
+    if route.description.key == key:
+        return route.description
+    cache_key = (route.platform, route.description.key, key)
+    interned = _INTERNED.get(cache_key)
+    # Sub-sensor names come from the gateway (wittiot renames channels at
+    # runtime), so a changed name replaces the interned description.
+    if interned is None or (name is not None and interned.name != name):
+        if name is None:
+            interned = replace(route.description, key=key)
+        else:
+            interned = replace(route.description, key=key, name=name)
+        _INTERNED[cache_key] = interned
+    return interned
+
+
+def _create_entity(
+    route: KeyRoute, coordinator: EcowittDataUpdateCoordinator, device_name: str, key: str
+) -> Entity:
+    if route.dev_type is None:
+        return route.entity_class(coordinator, device_name, route.description)
+    if route.aggregate:
+        return route.entity_class(
+            coordinator, device_name, route.dev_type, route.description
+        )
+    description = _description(route, key, MultiSensorInfo.SENSOR_INFO[key]["name"])
+    return route.entity_class(coordinator, device_name, route.dev_type, description)
+
+
+def _create_iot_entity(
+    route: KeyRoute, coordinator: EcowittDataUpdateCoordinator, device_name: str, nickname: str
+) -> Entity:
+    description = _description(route, f"{nickname}_{route.description.key}")
+    return route.entity_class(
+        coordinator=coordinator,
+        device_id=nickname,
+        description=description,
+        unique_id=device_name,
+    )
+
+
+def platform_routes(
+    platform: Platform,
+    keys: Iterable[str],
+    iot_records: Iterable[tuple[str, dict]],
+    compact: bool = False,
+) -> tuple[list[tuple[str, KeyRoute]], list[tuple[str, KeyRoute]]]:
+    """Return the routes of one platform for payload keys and IoT records."""
+    table = key_table(compact)
+    key_routes = [
+        (key, route)
+        for key in keys
+        for route in table.get(key, ())
+        if route.platform == platform
+    ]
+    fields = iot_field_table()
+    iot_routes = [
+        (nickname, route)
+        for nickname, item in iot_records
+        for field in item
+        for route in fields.get(field, ())
+        if route.platform == platform
+        and (not route.requires_online or item.get("rfnet_state") != 0)
+    ]
+    return key_routes, iot_routes
+
+
+@callback
+def async_setup_discovery(
+    coordinator: EcowittDataUpdateCoordinator,
+    entry: ConfigEntry,
+    platform: Platform,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Create a platform's entities now and whenever the coordinator finds new keys."""
+    registered: set[Any] = set()
+
+    @callback
+    def _async_discover(
+        key_routes: list[tuple[str, KeyRoute]], iot_routes: list[tuple[str, KeyRoute]]
+    ) -> None:
+        new_entities: list[Entity] = []
+        for key, route in key_routes:
+            entity_key = ("dev_type", route.dev_type) if route.aggregate else key
+            if entity_key not in registered:
+                registered.add(entity_key)
+                new_entities.append(
+                    _create_entity(route, coordinator, entry.unique_id, key)
+                )
+        for nickname, route in iot_routes:
+            composed_key = f"{nickname}_{route.description.key}"
+            if composed_key not in registered:
+                registered.add(composed_key)
+                new_entities.append(
+                    _create_iot_entity(route, coordinator, entry.unique_id, nickname)
+                )
+        if new_entities:
+            async_add_entities(new_entities)
+
+    _async_discover(
+        *platform_routes(
+            platform,
+            coordinator.data,
+            coordinator.iot_by_nickname.items(),
+            coordinator.compact_mode,
+        )
+    )
+    entry.async_on_unload(
+        coordinator.async_add_discovery_listener(platform, _async_discover)
+    )
+
+
+@callback
+def async_remove_other_mode_entities(
+    hass: HomeAssistant, entry: ConfigEntry, compact: bool
+) -> None:
+    """Remove sub-device entities left behind by the other entity mode."""
+    groups = sub_device_groups()
+    dev_types = {info["dev_type"] for info in MultiSensorInfo.SENSOR_INFO.values()}
+    if compact:
+        # Keys of sub-devices without a compact entity stay individual.
+        stale = {
+            f"{entry.unique_id}_{name}"
+            for name in (
+                *(key for keys in groups.values() for key in keys),
+                *(dev_type for dev_type in dev_types if dev_type not in groups),
+            )
+        }
+    else:
+        stale = {f"{entry.unique_id}_{dev_type}" for dev_type in dev_types}
+    registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity.unique_id in stale:
+            registry.async_remove(entity.entity_id)
@@ -0,0 +1,172 @@
+"""Background refresh of gateway firmware metadata."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from aiohttp.client_exceptions import ClientError
+from wittiot import API
+from wittiot.errors import WittiotError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .request_queue import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CONTROL,
+    READ_FIRMWARE_CHECK,
+    READ_FIRMWARE_INFO,
+    GatewayRequestQueue,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_TRANSIENT_ERRORS = (WittiotError, ClientError, asyncio.TimeoutError)
+
+# Firmware metadata rarely changes; refresh at most once per hour.
+FIRMWARE_CHECK_INTERVAL_SECONDS = 3600
+
+# Retry delay after a failed refresh, doubled per failure up to the interval.
+FIRMWARE_RETRY_SECONDS = 60
+
+FIRMWARE_REQUEST_TIMEOUT_SECONDS = 60
+
+
+class EcowittFirmwareTracker:
+    """Keep firmware metadata fresh without touching the data poll.
+
+    Runs on its own schedule as a background task of the config entry and
+    caches the last successful result; a failing firmware endpoint only
+    delays the next retry and never blocks or fails sensor updates.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: API,
+        request_queue: GatewayRequestQueue,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._entry = entry
+        self._api = api
+        self._request_queue = request_queue
+        self.info: dict[str, Any] | None = None
+        self._failures = 0
+        self._listeners: list[Callable[[], None]] = []
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call update_callback whenever new metadata is cached."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def async_start(self) -> None:
+        """Start refreshing in the background."""
+        self._schedule(0)
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel pending and running refreshes."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    @callback
+    def _schedule(self, delay: float) -> None:
+        if self._unsub_timer:
+            self._unsub_timer()
+        self._unsub_timer = async_call_later(self._hass, delay, self._async_timer_fired)
+
+    @callback
+    def _async_timer_fired(self, _now: Any) -> None:
+        self._unsub_timer = None
+        self._task = self._entry.async_create_background_task(
+            self._hass, self.async_refresh(), f"ecowitt firmware {self._entry.entry_id}"
+        )
+
+    async def async_refresh(self) -> None:
+        """Refresh the metadata now and reschedule the next refresh."""
+        try:
+            info = await self._async_fetch()
+        except _TRANSIENT_ERRORS as err:
+            self._failures += 1
+            delay = min(
+                FIRMWARE_RETRY_SECONDS * 2 ** (self._failures - 1),
+                FIRMWARE_CHECK_INTERVAL_SECONDS,
+            )
+            _LOGGER.debug(
+                "Firmware info fetch failed; keeping previous metadata, retry in %ss: %s",
+                delay,
+                err,
+            )
+            self._schedule(delay)
+            return
+
+        self._failures = 0
+        self.info = info
+        self._schedule(FIRMWARE_CHECK_INTERVAL_SECONDS)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def async_install(self) -> None:
+        """Start installing the latest firmware, ahead of queued reads."""
+        await self._async_request(
+            self._api.install_firmware_update, priority=PRIORITY_CONTROL
+        )
+
+    async def _async_request(
+        self,
+        request: Callable[[], Any],
+        merge_key: str | None = None,
+        priority: int = PRIORITY_BACKGROUND,
+    ) -> Any:
+        # The timeout starts with the request's turn, so a hung gateway
+        # holds up the requests queued behind it for a bounded time only.
+        async def _timed() -> Any:
+            async with asyncio.timeout(FIRMWARE_REQUEST_TIMEOUT_SECONDS):
+                return await request()
+
+        # Metadata checks yield to polls and control commands.
+        return await self._request_queue.async_call(
+            _timed, priority=priority, merge_key=merge_key
+        )
+
+    async def _async_fetch(self) -> dict[str, Any]:
+        firmware_info: dict[str, Any] = await self._async_request(
+            self._api.request_firmware_update_info, READ_FIRMWARE_INFO
+        )
+
+        try:
+            check_info: dict[str, Any] = await self._async_request(
+                self._api.request_firmware_update_check, READ_FIRMWARE_CHECK
+            )
+        except _TRANSIENT_ERRORS as err:
+            firmware_info["check_supported"] = False
+            firmware_info["install_supported"] = False
+            firmware_info["error"] = str(err)
+        else:
+            response = check_info.get("response", {})
+            if isinstance(response, dict):
+                firmware_info["is_new"] = response.get(
+                    "is_new", firmware_info.get("is_new", False)
+                )
+                firmware_info["release_summary"] = response.get(
+                    "msg", firmware_info.get("release_summary")
+                )
+                firmware_info["check_response"] = response
+        return firmware_info
@@ -0,0 +1,96 @@
+"""Rolling gateway latency statistics and the request timeout derived from them."""
+
+from __future__ import annotations
+
+from collections import deque
+import math
+from typing import Any
+
+# Number of recent requests the distribution is computed over.
+LATENCY_WINDOW = 100
+
+# Samples required before the observed distribution replaces the ceiling.
+LATENCY_MIN_SAMPLES = 10
+
+# The timeout is this multiple of the observed p99, clamped to the bounds
+# below. The floor leaves room for a busy gateway; the ceiling is the old
+# fixed timeout used while the distribution is still unknown.
+TIMEOUT_P99_FACTOR = 3
+TIMEOUT_FLOOR_SECONDS = 5.0
+TIMEOUT_CEILING_SECONDS = 60.0
+
+
+class GatewayLatencyTracker:
+    """Track how quickly one gateway answers and size its timeout to match."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.timeouts = 0
+
+    def record(self, seconds: float) -> None:
+        """Record the duration of a completed request."""
+        self._samples.append(seconds)
+
+    def record_timeout(self) -> None:
+        """Record a request that hit the timeout.
+
+        The timeout itself is stored as a (censored) sample so that a gateway
+        slowing down past its current timeout pushes the timeout up instead
+        of staying invisible to the distribution.
+        """
+        self.timeouts += 1
+        self._samples.append(self.timeout)
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the nearest-rank percentile of the recorded samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    @property
+    def timeout(self) -> float:
+        """Return the timeout to use for the next request."""
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            return TIMEOUT_CEILING_SECONDS
+        p99 = self.percentile(99)
+        return min(
+            max(p99 * TIMEOUT_P99_FACTOR, TIMEOUT_FLOOR_SECONDS),
+            TIMEOUT_CEILING_SECONDS,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "timeouts": self.timeouts,
+            "timeout": self.timeout,
+        }
+
+
+class GatewayLatencyStats:
+    """Latency of one gateway, tracked per kind of request.
+
+    A full poll is a dozen HTTP requests while an IoT device read or switch
+    command is one; a shared distribution would size the timeout of each
+    after the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._trackers: dict[str, GatewayLatencyTracker] = {}
+
+    def tracker(self, kind: str) -> GatewayLatencyTracker:
+        """Return the tracker of one kind of request."""
+        if (tracker := self._trackers.get(kind)) is None:
+            tracker = self._trackers[kind] = GatewayLatencyTracker()
+        return tracker
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics per kind of request for diagnostics."""
+        return {kind: tracker.as_dict() for kind, tracker in self._trackers.items()}
@@ -0,0 +1,121 @@
+"""Recorder write budget: when a changed sensor value is worth a state write."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.helpers.entity import EntityCategory
+
+# A change held back by a deadband is still written after this long, so the
+# recorded state never lags the gateway indefinitely. This only releases
+# deferred changes: an unchanged value is never rewritten, as Home Assistant
+# would not record the repeated state anyway.
+PUBLISH_MAX_DEFER_SECONDS = 900.0
+
+# Diagnostics (battery, signal, RSSI, firmware) are written at most this often.
+DIAGNOSTIC_PUBLISH_INTERVAL_SECONDS = 600.0
+
+# Readings are decimal fractions; 72.3 - 72.2 is 0.0999... in binary floating
+# point and must still count as a full 0.1 step.
+DEADBAND_TOLERANCE = 1e-9
+
+
+@dataclass(frozen=True, slots=True)
+class PublishRule:
+    """How often, and for how large a change, a sensor's state is written."""
+
+    # Numeric changes smaller than this are held back for up to max_defer.
+    deadband: float = 0.0
+    # Minimum time between two writes of a changed value.
+    min_interval: float = 0.0
+    max_defer: float = PUBLISH_MAX_DEFER_SECONDS
+
+
+_DEFAULT_RULE = PublishRule()
+_DIAGNOSTIC_RULE = PublishRule(min_interval=DIAGNOSTIC_PUBLISH_INTERVAL_SECONDS)
+
+# Payload keys (or IoT record fields), checked first.
+KEY_RULES: dict[str, PublishRule] = {
+    "iotbatt": _DIAGNOSTIC_RULE,
+    "signal": _DIAGNOSTIC_RULE,
+    "rssi": _DIAGNOSTIC_RULE,
+}
+
+# Device classes, checked when the key has no rule. Deadbands are in the
+# gateway's native units (°F, %) and equal one display step, so every step
+# the gateway reports is written and only finer noise is held back.
+DEVICE_CLASS_RULES: dict[SensorDeviceClass, PublishRule] = {
+    SensorDeviceClass.TEMPERATURE: PublishRule(deadband=0.1),
+    SensorDeviceClass.HUMIDITY: PublishRule(deadband=1.0),
+    SensorDeviceClass.BATTERY: _DIAGNOSTIC_RULE,
+    SensorDeviceClass.SIGNAL_STRENGTH: _DIAGNOSTIC_RULE,
+}
+
+
+@cache
+def publish_rule(
+    key: str,
+    device_class: SensorDeviceClass | str | None,
+    entity_category: EntityCategory | None,
+) -> PublishRule:
+    """Return the rule for a sensor; other diagnostic entities use the diagnostic rule."""
+    if key in KEY_RULES:
+        return KEY_RULES[key]
+    if device_class in DEVICE_CLASS_RULES:
+        return DEVICE_CLASS_RULES[device_class]
+    if entity_category == EntityCategory.DIAGNOSTIC:
+        return _DIAGNOSTIC_RULE
+    return _DEFAULT_RULE
+
+
+def _as_number(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PublishGate:
+    """Track the last written state of one entity and apply its rule."""
+
+    __slots__ = ("rule", "_value", "_available", "_written_at")
+
+    def __init__(self, rule: PublishRule) -> None:
+        """Initialize."""
+        self.rule = rule
+        self._value: Any = None
+        self._available: bool | None = None
+        self._written_at: float | None = None
+
+    def delay(self, value: Any, available: bool, now: float) -> float | None:
+        """Return how long to hold back a write of value.
+
+        0 means write now; None means the written state is already current.
+        Availability changes are always written immediately.
+        """
+        if self._written_at is None or available != self._available:
+            return 0.0
+        if value == self._value:
+            return None
+        elapsed = now - self._written_at
+        wait = self.rule.min_interval - elapsed
+        if self.rule.deadband:
+            new, old = _as_number(value), _as_number(self._value)
+            if (
+                new is not None
+                and old is not None
+                and abs(new - old) < self.rule.deadband - DEADBAND_TOLERANCE
+            ):
+                wait = max(wait, self.rule.max_defer - elapsed)
+        return max(wait, 0.0)
+
+    def record(self, value: Any, available: bool, now: float) -> None:
+        """Record that value was written at now."""
+        self._value = value
+        self._available = available
+        self._written_at = now
@@ -0,0 +1,208 @@
+"""Local receiver for the gateway's "Customized" weather-service upload."""
+
+from __future__ import annotations
+
+from functools import partial
+from http import HTTPStatus
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Callable, Mapping
+
+from aiohttp import web
+
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.translation import async_get_translations
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import EcowittDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _rounded(digits: int) -> Callable[[str], float]:
+    """Parse a reading already in wittiot's unit, at the precision it reports."""
+
+    def _convert(value: str) -> float:
+        return round(float(value), digits)
+
+    return _convert
+
+
+def _integer(value: str) -> str:
+    # wittiot passes these through as the gateway's integer strings.
+    return str(int(float(value)))
+
+
+def _lightning_distance(value: str) -> float:
+    # Uploaded in km; wittiot reports miles.
+    return round(float(value) * 0.62137, 1)
+
+
+def _piezo_state(value: str) -> str:
+    return "No rain" if value == "0" else "Raining"
+
+
+def _leak_state(value: str) -> str:
+    return "Normal" if value == "0" else "Leak"
+
+
+_TEMPERATURE = _rounded(1)
+_TWO_DECIMALS = _rounded(2)
+
+# Upload fields by the wittiot key they update and how to convert them.
+# The upload uses imperial units, like the wittiot payload; fields without
+# an entry here (battery levels, PM2.5, lightning time, ...) differ in units
+# or format and keep coming from the polling heartbeat instead.
+_FIELDS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "tempinf": ("tempinf", _TEMPERATURE),
+    "tempf": ("tempf", _TEMPERATURE),
+    "tf_co2": ("tf_co2", _TEMPERATURE),
+    "humidityin": ("humidityin", _integer),
+    "humidity": ("humidity", _integer),
+    "humi_co2": ("humi_co2", _integer),
+    "baromrelin": ("baromrelin", _TWO_DECIMALS),
+    "baromabsin": ("baromabsin", _TWO_DECIMALS),
+    "winddir": ("winddir", _integer),
+    "windspeedmph": ("windspeedmph", _TWO_DECIMALS),
+    "windgustmph": ("windgustmph", _TWO_DECIMALS),
+    "maxdailygust": ("daywindmax", _TWO_DECIMALS),
+    "solarradiation": ("solarradiation", _TWO_DECIMALS),
+    "uv": ("uv", _integer),
+    "rainratein": ("rainratein", _TWO_DECIMALS),
+    "eventrainin": ("eventrainin", _TWO_DECIMALS),
+    "dailyrainin": ("dailyrainin", _TWO_DECIMALS),
+    "weeklyrainin": ("weeklyrainin", _TWO_DECIMALS),
+    "monthlyrainin": ("monthlyrainin", _TWO_DECIMALS),
+    "yearlyrainin": ("yearlyrainin", _TWO_DECIMALS),
+    "totalrainin": ("totalrainin", _TWO_DECIMALS),
+    "rrain_piezo": ("rrain_piezo", _TWO_DECIMALS),
+    "erain_piezo": ("erain_piezo", _TWO_DECIMALS),
+    "drain_piezo": ("drain_piezo", _TWO_DECIMALS),
+    "wrain_piezo": ("wrain_piezo", _TWO_DECIMALS),
+    "mrain_piezo": ("mrain_piezo", _TWO_DECIMALS),
+    "yrain_piezo": ("yrain_piezo", _TWO_DECIMALS),
+    "train_piezo": ("train_piezo", _TWO_DECIMALS),
+    "srain_piezo": ("srain_piezo", _piezo_state),
+    "lightning": ("lightning", _lightning_distance),
+    "lightning_num": ("lightning_num", _integer),
+    "co2": ("co2", _integer),
+    "co2_24h": ("co2_24h", _integer),
+}
+_CHANNEL_FIELDS = (
+    (re.compile(r"^temp(\d+)f$"), "temp_ch{}", _TEMPERATURE),
+    (re.compile(r"^tf_ch(\d+)$"), "tf_ch{}", _TEMPERATURE),
+    (re.compile(r"^humidity(\d+)$"), "humidity_ch{}", _integer),
+    (re.compile(r"^soilmoisture(\d+)$"), "Soilmoisture_ch{}", _integer),
+    (re.compile(r"^leafwetness_ch(\d+)$"), "leaf_ch{}", _integer),
+    (re.compile(r"^leak_ch(\d+)$"), "leak_ch{}", _leak_state),
+)
+
+
+def _field_converter(field: str) -> tuple[str, Callable[[str], Any]] | None:
+    if (known := _FIELDS.get(field)) is not None:
+        return known
+    for pattern, template, convert in _CHANNEL_FIELDS:
+        if match := pattern.match(field):
+            return template.format(match.group(1)), convert
+    return None
+
+
+def decode_push_payload(form: Mapping[str, str]) -> dict[str, Any]:
+    """Decode an Ecowitt-protocol upload into coordinator payload keys.
+
+    Values are converted to the types, units and precision wittiot
+    produces, so a pushed reading equals the polled one and alternating
+    sources do not register as changes. Unknown or unparsable fields are
+    dropped.
+    """
+    decoded: dict[str, Any] = {}
+    for field, value in form.items():
+        if (converter := _field_converter(field)) is None:
+            continue
+        key, convert = converter
+        try:
+            decoded[key] = convert(value)
+        except ValueError:
+            _LOGGER.debug("Ignoring upload field %s=%r", field, value)
+    return decoded
+
+
+def upload_matches(
+    coordinator: EcowittDataUpdateCoordinator,
+    form: Mapping[str, Any],
+    remote: str | None,
+) -> bool:
+    """Return True if an upload comes from the entry's own gateway.
+
+    The gateway's PASSKEY (MD5 of its MAC) decides when both it and the
+    entry's MAC are known. Otherwise only the sender address can: an entry
+    configured by hostname then accepts no uploads.
+    """
+    passkey = str(form.get("PASSKEY", "")).upper()
+    if passkey and (expected := coordinator.push_passkey) is not None:
+        return passkey == expected
+    return remote == coordinator.host
+
+
+async def async_notify_push_path(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Tell the user which path to enter in the gateway's Customized upload."""
+    translations = await async_get_translations(
+        hass, hass.config.language or "en", "component", DOMAIN, ["notifications"]
+    )
+    path = webhook.async_generate_path(entry.data[CONF_WEBHOOK_ID])
+    title = translations.get(
+        f"component.{DOMAIN}.notifications.push_title", "Ecowitt – Push mode"
+    )
+    message = translations.get(
+        f"component.{DOMAIN}.notifications.push_message",
+        "Set the Customized upload path of {name} to `{path}`.",
+    )
+    await hass.services.async_call(
+        "persistent_notification",
+        "create",
+        service_data={
+            "message": message.replace("{name}", entry.title).replace("{path}", path),
+            "title": title,
+            "notification_id": f"ecowitt_push_path_{entry.entry_id}",
+        },
+        blocking=False,
+    )
+
+
+@callback
+def async_register_push_webhook(
+    hass: HomeAssistant, coordinator: EcowittDataUpdateCoordinator
+) -> CALLBACK_TYPE:
+    """Receive the entry's uploads on its webhook; return the unregister callback.
+
+    The webhook id is a random secret per entry, so a LAN host that merely
+    knows the gateway's MAC cannot post readings for it.
+    """
+    entry = coordinator.config_entry
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+
+    async def _async_handle_upload(
+        hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        form = await request.post()
+        if not upload_matches(coordinator, form, request.remote):
+            _LOGGER.debug(
+                "Ignoring Ecowitt upload from %s: not gateway %s",
+                request.remote,
+                entry.title,
+            )
+            return web.Response(status=HTTPStatus.FORBIDDEN)
+        coordinator.async_handle_push(
+            decode_push_payload({k: str(v) for k, v in form.items()})
+        )
+        return web.Response(status=HTTPStatus.OK)
+
+    webhook.async_register(
+        hass, DOMAIN, entry.title, webhook_id, _async_handle_upload, local_only=True
+    )
+    return partial(webhook.async_unregister, hass, webhook_id)
@@ -0,0 +1,179 @@
+"""Per-gateway serialization of HTTP requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import time
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+DATA_REQUEST_QUEUES = f"{DOMAIN}_request_queues"
+
+# Lower runs first. Control commands (switching an IoT device, installing
+# firmware) jump ahead of data reads; firmware metadata checks go last.
+PRIORITY_CONTROL = 0
+PRIORITY_READ = 1
+PRIORITY_BACKGROUND = 2
+
+# Merge keys of the gateway's idempotent reads.
+READ_LOC_INFO = "loc_info"
+READ_LOC_ALLINFO = "loc_allinfo"
+READ_FIRMWARE_INFO = "firmware_info"
+READ_FIRMWARE_CHECK = "firmware_check"
+
+_T = TypeVar("_T")
+
+
+@dataclass(order=True)
+class _QueuedRequest:
+    priority: int
+    seq: int
+    request: Callable[[], Awaitable[Any]] = field(compare=False)
+    merge_key: Hashable | None = field(compare=False)
+    result: asyncio.Future[Any] = field(compare=False)
+    enqueued: float = field(compare=False, default=0.0)
+    # Callers awaiting the result: the one that queued it plus merged reads.
+    waiters: int = field(compare=False, default=1)
+    task: asyncio.Task[None] | None = field(compare=False, default=None)
+
+
+class GatewayRequestQueue:
+    """Run one gateway request at a time, in priority order.
+
+    The gateway's HTTP server handles one request at a time; concurrent
+    callers (polls, switch commands, firmware checks, config flows) only
+    slow each other down or time out. Callers wait for their turn here
+    instead. A read with a merge key that is already waiting does not queue
+    again: it shares the pending request's result.
+
+    Requests run in a task of their own, so a caller that gives up only
+    withdraws its interest: the request is dropped (or cancelled, once
+    running) when no caller is left waiting for it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._heap: list[_QueuedRequest] = []
+        self._seq = itertools.count()
+        self._running: _QueuedRequest | None = None
+        # Waiting (not yet started) mergeable requests by merge key.
+        self._mergeable: dict[Hashable, _QueuedRequest] = {}
+        self.requests = 0
+        self.merged = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of requests waiting for their turn."""
+        return len(self._heap)
+
+    async def async_call(
+        self,
+        request: Callable[[], Awaitable[_T]],
+        *,
+        priority: int = PRIORITY_READ,
+        merge_key: Hashable | None = None,
+    ) -> _T:
+        """Run request once every earlier or more urgent request has finished."""
+        if merge_key is not None and (queued := self._mergeable.get(merge_key)):
+            self.merged += 1
+            queued.waiters += 1
+        else:
+            queued = _QueuedRequest(
+                priority,
+                next(self._seq),
+                request,
+                merge_key,
+                asyncio.get_running_loop().create_future(),
+                time.monotonic(),
+            )
+            heapq.heappush(self._heap, queued)
+            self.max_depth = max(self.max_depth, len(self._heap))
+            if merge_key is not None:
+                self._mergeable[merge_key] = queued
+            self._dispatch()
+
+        try:
+            return await asyncio.shield(queued.result)
+        except asyncio.CancelledError:
+            if not queued.result.cancelled():
+                self._abandon(queued)
+            raise
+
+    def _abandon(self, queued: _QueuedRequest) -> None:
+        """Withdraw a cancelled caller from its request."""
+        queued.waiters -= 1
+        if queued.waiters:
+            # Merged callers still want the result.
+            return
+        if queued.task is None:
+            self._heap.remove(queued)
+            heapq.heapify(self._heap)
+            self._forget(queued)
+            queued.result.cancel()
+        else:
+            queued.task.cancel()
+
+    def _forget(self, queued: _QueuedRequest) -> None:
+        if queued.merge_key is not None and self._mergeable.get(queued.merge_key) is queued:
+            del self._mergeable[queued.merge_key]
+
+    def _dispatch(self) -> None:
+        if self._running is not None or not self._heap:
+            return
+        queued = self._running = heapq.heappop(self._heap)
+        # Once started, a read no longer absorbs new callers: they could
+        # otherwise get a result from before their request.
+        self._forget(queued)
+        wait = time.monotonic() - queued.enqueued
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        queued.task = asyncio.get_running_loop().create_task(self._async_run(queued))
+
+    async def _async_run(self, queued: _QueuedRequest) -> None:
+        try:
+            result = await queued.request()
+        except asyncio.CancelledError:
+            queued.result.cancel()
+            raise
+        except Exception as err:
+            queued.result.set_exception(err)
+            # Nobody may be left to see it; avoid "never retrieved" noise.
+            queued.result.exception()
+        else:
+            queued.result.set_result(result)
+        finally:
+            self._running = None
+            self._dispatch()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the contention statistics for diagnostics."""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "requests": self.requests,
+            "merged": self.merged,
+            "mean_wait": self.total_wait / self.requests if self.requests else None,
+            "max_wait": self.max_wait,
+        }
+
+
+@callback
+def async_get_request_queue(hass: HomeAssistant, host: str) -> GatewayRequestQueue:
+    """Return the request queue shared by everything talking to host."""
+    queues: dict[str, GatewayRequestQueue] = hass.data.setdefault(
+        DATA_REQUEST_QUEUES, {}
+    )
+    if host not in queues:
+        queues[host] = GatewayRequestQueue()
+    return queues[host]
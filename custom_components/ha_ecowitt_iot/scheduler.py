@@ -0,0 +1,74 @@
+"""Fleet-wide scheduling of gateway polls."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import EcowittDataUpdateCoordinator
+
+DATA_POLL_SCHEDULER = f"{DOMAIN}_poll_scheduler"
+
+# Coordinator reads allowed in flight at once across all config entries.
+# Control commands such as switching an IoT device are not counted.
+MAX_CONCURRENT_POLLS = 4
+
+
+class EcowittPollScheduler:
+    """Spread gateway polls evenly over their interval.
+
+    Each registered coordinator gets a phase, a fraction of its update
+    interval, so that N gateways sharing an interval are polled N evenly
+    spaced times per cycle instead of in lockstep. Phases are re-spread
+    whenever an entry is added or removed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._coordinators: list[EcowittDataUpdateCoordinator] = []
+        self._phases: dict[str, float] = {}
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+
+    @callback
+    def async_register(self, coordinator: EcowittDataUpdateCoordinator) -> CALLBACK_TYPE:
+        """Add a coordinator to the fleet; returns a callback removing it."""
+        self._coordinators.append(coordinator)
+        self._spread()
+
+        @callback
+        def _unregister() -> None:
+            if coordinator in self._coordinators:
+                self._coordinators.remove(coordinator)
+                self._spread()
+
+        return _unregister
+
+    def _spread(self) -> None:
+        count = len(self._coordinators)
+        self._phases = {
+            coordinator.config_entry.entry_id: index / count
+            for index, coordinator in enumerate(self._coordinators)
+        }
+
+    def next_delay(self, coordinator: EcowittDataUpdateCoordinator, interval: float) -> float:
+        """Return the seconds until the coordinator's next slot."""
+        phase = self._phases.get(coordinator.config_entry.entry_id, 0.0)
+        offset = phase * interval
+        now = self._hass.loop.time()
+        next_slot = (math.floor((now - offset) / interval) + 1) * interval + offset
+        return next_slot - now
+
+
+@callback
+def async_get_poll_scheduler(hass: HomeAssistant) -> EcowittPollScheduler:
+    """Return the scheduler shared by all config entries."""
+    if DATA_POLL_SCHEDULER not in hass.data:
+        hass.data[DATA_POLL_SCHEDULER] = EcowittPollScheduler(hass)
+    return hass.data[DATA_POLL_SCHEDULER]
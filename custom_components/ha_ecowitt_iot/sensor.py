@@ -1,10 +1,10 @@
 """Platform for sensor integration."""
 
-import dataclasses
 from datetime import datetime
+import time
 from typing import Final, Any
 import logging
-from wittiot import MultiSensorInfo, WittiotDataTypes, SubSensorname
+from wittiot import WittiotDataTypes
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -15,7 +15,6 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONCENTRATION_PARTS_PER_MILLION,
     CONCENTRATION_MICROGRAMS_PER_CUBIC_METER,
-    CONF_HOST,
     DEGREE,
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
@@ -34,15 +33,23 @@ from homeassistant.const import (
     UnitOfTemperature,
     UnitOfVolumetricFlux,
     UnitOfConductivity,
+    Platform,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.event import async_call_later
 from .const import DOMAIN
-from .coordinator import EcowittDataUpdateCoordinator
-from homeassistant.helpers import device_registry as dr
+from .coordinator import (
+    LAST_SEEN_CONTEXT,
+    EcowittDataUpdateCoordinator,
+    iot_context,
+    sub_device_context,
+)
+from .entity_table import async_setup_discovery, sub_device_groups
+from .publish import PublishGate, publish_rule
+from .timestamps import TIMESTAMP_PARSER
 from homeassistant.util import dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
@@ -680,283 +687,182 @@ IOT_SENSOR_DESCRIPTIONS = (
 )
 
 
-def async_remove_old_sub_device(hass: HomeAssistant) -> None:
-    """删除旧的子设备"""
-
-    device_reg = dr.async_get(hass)
-
-    prefixes = SubSensorname.prefixes
-    deviceid = []
-    for dev in device_reg.devices.values():
-        if not dev.identifiers:
-            continue
-        for identifier in dev.identifiers:
-            if len(identifier) < 2:
-                continue
-            if isinstance(identifier[1], (str, list)):
-                if [prefix for prefix in prefixes if prefix in identifier[1]]:
-                    deviceid.append(dev.id)
-
-    for oldsub in deviceid:
-        device_reg.async_remove_device(oldsub)
-        _LOGGER.debug("Old sub device %s removed successfully", oldsub)
-
-
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up sensor entities based on a config entry."""
-    async_remove_old_sub_device(hass)
-
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    registered_main: set[str] = set()
-    async_add_entities(
-        MainDevEcowittSensor(coordinator, entry.unique_id, desc)
-        for desc in SENSOR_DESCRIPTIONS
-        if desc.key in coordinator.data
-    )
-    for desc in SENSOR_DESCRIPTIONS:
-        if desc.key in coordinator.data:
-            registered_main.add(desc.key)
-    # Subdevice Data
-    subsensors: list[SubDevEcowittSensor] = []
-    registered_sub: set[str] = set()
-    for key in coordinator.data:
-        if key in MultiSensorInfo.SENSOR_INFO:
-            if key in MultiSensorInfo.SENSOR_INFO and MultiSensorInfo.SENSOR_INFO[key][
-                "data_type"
-            ] in (WittiotDataTypes.LEAK, WittiotDataTypes.BATTERY_BINARY):
-                continue
-            mapping = ECOWITT_SENSORS_MAPPING[
-                MultiSensorInfo.SENSOR_INFO[key]["data_type"]
-            ]
-            description = dataclasses.replace(
-                mapping,
-                key=key,
-                name=MultiSensorInfo.SENSOR_INFO[key]["name"],
-            )
-            subsensors.append(
-                SubDevEcowittSensor(
-                    coordinator,
-                    entry.unique_id,
-                    MultiSensorInfo.SENSOR_INFO[key]["dev_type"],
-                    description,
-                )
-            )
-            registered_sub.add(key)
-    async_add_entities(subsensors)
-
-    if "iot_list" in coordinator.data:
-        iot_sensors: list[IotDeviceSensor] = []
-        desc_map = {desc.key: desc for desc in IOT_SENSOR_DESCRIPTIONS}
-        iot_data = coordinator.data["iot_list"]
-        commands = iot_data["command"]
-        registered_iot: set[str] = set()
-        for i, item in enumerate(commands):
-            nickname = item.get("nickname")
-            if nickname is None:
-                continue
-            for key in list(item):
-                if key in desc_map:
-                    desc = desc_map[key]
-                    device_desc = dataclasses.replace(
-                        desc,
-                        key=f"{nickname}_{desc.key}",
-                        # name=f"{device_info.get('name', f'设备 {device_id}')} {desc.name}",
-                    )
-                    # 添加到实体列表
-                    iot_sensors.append(
-                        IotDeviceSensor(
-                            coordinator=coordinator,
-                            device_id=nickname,
-                            description=device_desc,
-                            unique_id=entry.unique_id,
-                        )
-                    )
-                    # _LOGGER.info("%s : %s : %s", key, item[key], item["nickname"])
-                    registered_iot.add(f"{nickname}_{desc.key}")
-        async_add_entities(iot_sensors)
-    else:
-        registered_iot = set()
+    async_add_entities([GatewayLastSeenSensor(coordinator, entry.unique_id)])
+    async_setup_discovery(coordinator, entry, Platform.SENSOR, async_add_entities)
 
-    async def _process_new_data() -> None:
-        new_entities: list[SensorEntity] = []
-        for desc in SENSOR_DESCRIPTIONS:
-            if desc.key in coordinator.data and desc.key not in registered_main:
-                new_entities.append(
-                    MainDevEcowittSensor(coordinator, entry.unique_id, desc)
-                )
-                registered_main.add(desc.key)
-        for key in coordinator.data:
-            if key in MultiSensorInfo.SENSOR_INFO:
-                info = MultiSensorInfo.SENSOR_INFO[key]
-                if info["data_type"] in (
-                    WittiotDataTypes.LEAK,
-                    WittiotDataTypes.BATTERY_BINARY,
-                ):
-                    continue
-                if key not in registered_sub:
-                    mapping = ECOWITT_SENSORS_MAPPING[info["data_type"]]
-                    description = dataclasses.replace(
-                        mapping,
-                        key=key,
-                        name=info["name"],
-                    )
-                    new_entities.append(
-                        SubDevEcowittSensor(
-                            coordinator,
-                            entry.unique_id,
-                            info["dev_type"],
-                            description,
-                        )
-                    )
-                    registered_sub.add(key)
-        if "iot_list" in coordinator.data:
-            desc_map = {desc.key: desc for desc in IOT_SENSOR_DESCRIPTIONS}
-            iot_data = coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                for key in list(item):
-                    if key in desc_map:
-                        desc = desc_map[key]
-                        composed_key = f"{nickname}_{desc.key}"
-                        if composed_key not in registered_iot:
-                            device_desc = dataclasses.replace(
-                                desc,
-                                key=composed_key,
-                            )
-                            new_entities.append(
-                                IotDeviceSensor(
-                                    coordinator=coordinator,
-                                    device_id=nickname,
-                                    description=device_desc,
-                                    unique_id=entry.unique_id,
-                                )
-                            )
-                            registered_iot.add(composed_key)
-        if new_entities:
-            async_add_entities(new_entities)
 
-    coordinator.async_add_listener(lambda: hass.async_create_task(_process_new_data()))
-
-
-class MainDevEcowittSensor(
+def _battery_icon(val: Any) -> str | None:
+    """Return the battery icon for a 0-100 level."""
+    try:
+        # 支持 20, 40, 60, 80, 100 阶梯动态图标
+        level = int(val)
+    except (ValueError, TypeError):
+        return None
+    if level <= 10:
+        return "mdi:battery-outline"
+    if level <= 30:
+        return "mdi:battery-20"
+    if level <= 50:
+        return "mdi:battery-40"
+    if level <= 70:
+        return "mdi:battery-60"
+    if level <= 90:
+        return "mdi:battery-80"
+    return "mdi:battery"
+
+
+class EcowittSensorBase(
     CoordinatorEntity[EcowittDataUpdateCoordinator], SensorEntity
 ):
-    """Define a Local sensor."""
+    """Sensor whose derived values are computed once per data generation.
+
+    HA reads native_value, extra_state_attributes and icon on every state
+    write; all three are derived together from the raw value the first time
+    one of them is read after the coordinator publishes new data.
+
+    State writes go through a PublishGate (see publish.py): changes inside
+    the sensor's deadband or publish interval are deferred, not dropped.
+    """
 
     _attr_has_entity_name = True
     entity_description: SensorEntityDescription
 
-    _TIMESTAMP_FORMATS = ["%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S"]
-
-    def __init__(
-        self,
-        coordinator: EcowittDataUpdateCoordinator,
-        device_name: str,
-        description: SensorEntityDescription,
-    ) -> None:
-        """Initialize."""
-        super().__init__(coordinator)
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_name}")},
-            manufacturer="Ecowitt",
-            name=f"{device_name}",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
+    _cache_generation = -1
+    _cached_value: str | int | float | datetime | None = None
+    _cached_attrs: dict[str, Any] | None = None
+    _cached_icon: str | None = None
+
+    _gate: PublishGate | None = None
+    _unsub_publish: CALLBACK_TYPE | None = None
+
+    def _raw_value(self) -> Any:
+        """Return this sensor's raw value from the coordinator data."""
+        return self.coordinator.data.get(self.entity_description.key)
+
+    def _publish_key(self) -> str:
+        """Return the key the publish rule is looked up by."""
+        return self.entity_description.key
+
+    async def async_added_to_hass(self) -> None:
+        """Start gating writes from the state written when the entity was added."""
+        await super().async_added_to_hass()
+        description = self.entity_description
+        self._gate = PublishGate(
+            publish_rule(
+                self._publish_key(),
+                description.device_class,
+                description.entity_category,
+            )
+        )
+        self._refresh_derived()
+        self._gate.record(self._gated_value(), self.available, time.monotonic())
+        self.async_on_remove(self._cancel_deferred_publish)
+
+    @callback
+    def _cancel_deferred_publish(self) -> None:
+        if self._unsub_publish:
+            self._unsub_publish()
+            self._unsub_publish = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state now, later, or not at all per the publish rule."""
+        if self._gate is None:
+            super()._handle_coordinator_update()
+            return
+        self._refresh_derived()
+        self._cancel_deferred_publish()
+        delay = self._gate.delay(self._gated_value(), self.available, time.monotonic())
+        if delay is None:
+            return
+        if delay == 0:
+            self._async_publish()
+            return
+        self._unsub_publish = async_call_later(
+            self.hass, delay, self._async_deferred_publish
         )
 
-        # adding mac address as connection info
-        mac = coordinator.data["mac"]
-        if mac:
-            self._attr_device_info["connections"] = {
-                (dr.CONNECTION_NETWORK_MAC, dr.format_mac(mac))
-            }
-
-        self._attr_unique_id = f"{device_name}_{description.key}"
-        self.entity_description = description
-
-    def _parse_timestamp(self, val: str) -> datetime | None:
-        """Parse a timestamp string in known formats."""
-        for fmt in self._TIMESTAMP_FORMATS:
-            try:
-                naive_dt = datetime.strptime(val, fmt)
-                if naive_dt.year < 2000:
-                    return None
-                return dt_util.as_utc(naive_dt)
-            except ValueError:
-                continue
-        return None
+    @callback
+    def _async_deferred_publish(self, _now: Any) -> None:
+        self._unsub_publish = None
+        self._refresh_derived()
+        self._async_publish()
+
+    @callback
+    def _async_publish(self) -> None:
+        self._gate.record(self._gated_value(), self.available, time.monotonic())
+        self.async_write_ha_state()
+
+    def _gated_value(self) -> Any:
+        """Return what the publish rule compares between writes."""
+        return self._cached_value
+
+    def _refresh_derived(self) -> None:
+        generation = self.coordinator.generation
+        if generation == self._cache_generation:
+            return
+        val = self._raw_value()
+        device_class = self.entity_description.device_class
+        value = val
+        attrs: dict[str, Any] = {}
+        icon = None
+        if device_class == SensorDeviceClass.BATTERY:
+            if val == "DC":
+                value = 100
+                attrs["power_source"] = "DC"
+                icon = "mdi:power-plug"
+            else:
+                icon = _battery_icon(val)
+        elif device_class == SensorDeviceClass.TIMESTAMP and isinstance(val, str):
+            value = TIMESTAMP_PARSER.parse(self.entity_description.key, val)
+        self._cached_value = value
+        self._cached_attrs = attrs or None
+        self._cached_icon = icon
+        self._cache_generation = generation
 
     @property
     def native_value(self) -> str | int | float | datetime | None:
         """Return the state."""
-        val = self.coordinator.data.get(self.entity_description.key)
-        if (
-            self.entity_description.device_class == SensorDeviceClass.BATTERY
-            and val == "DC"
-        ):
-            return 100
-        if (
-            self.entity_description.device_class == SensorDeviceClass.TIMESTAMP
-            and isinstance(val, str)
-        ):
-            return self._parse_timestamp(val)
-        return val
+        self._refresh_derived()
+        return self._cached_value
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return entity specific state attributes."""
-        attrs = {}
-        val = self.coordinator.data.get(self.entity_description.key)
-        if (
-            self.entity_description.device_class == SensorDeviceClass.BATTERY
-            and val == "DC"
-        ):
-            attrs["power_source"] = "DC"
-        last_seen = self.coordinator.data.get("_last_seen")
-        if last_seen is not None:
-            attrs["last_seen"] = last_seen
-        return attrs or None
+        self._refresh_derived()
+        return self._cached_attrs
 
     @property
     def icon(self) -> str | None:
         """Return the icon to use in the frontend, if any."""
-        val = self.coordinator.data.get(self.entity_description.key)
-        if self.entity_description.device_class == SensorDeviceClass.BATTERY:
-            if val == "DC":
-                return "mdi:power-plug"
-            try:
-                # 支持 20, 40, 60, 80, 100 阶梯动态图标
-                level = int(val)
-                if level <= 10:
-                    return "mdi:battery-outline"
-                if level <= 30:
-                    return "mdi:battery-20"
-                if level <= 50:
-                    return "mdi:battery-40"
-                if level <= 70:
-                    return "mdi:battery-60"
-                if level <= 90:
-                    return "mdi:battery-80"
-                return "mdi:battery"
-            except (ValueError, TypeError):
-                pass
-        return super().icon
+        self._refresh_derived()
+        return self._cached_icon or super().icon
 
 
-class SubDevEcowittSensor(
-    CoordinatorEntity[EcowittDataUpdateCoordinator], SensorEntity
-):
-    """Define an Local sensor."""
+class MainDevEcowittSensor(EcowittSensorBase):
+    """Define a Local sensor."""
 
-    _attr_has_entity_name = True
-    entity_description: SensorEntityDescription
+    def __init__(
+        self,
+        coordinator: EcowittDataUpdateCoordinator,
+        device_name: str,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator, context=description.key)
+        self._attr_device_info = coordinator.device_info()
+
+        self._attr_unique_id = f"{device_name}_{description.key}"
+        self.entity_description = description
 
-    _TIMESTAMP_FORMATS = ["%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S"]
+
+class SubDevEcowittSensor(EcowittSensorBase):
+    """Define an Local sensor."""
 
     def __init__(
         self,
@@ -966,7 +872,7 @@ class SubDevEcowittSensor(
         description: SensorEntityDescription,
     ) -> None:
         """Initialize."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=description.key)
         # self._attr_device_info = DeviceInfo(
         #     identifiers={(DOMAIN, f"{device_name}_{sensor_type}")},
         #     manufacturer="Ecowitt",
@@ -975,90 +881,57 @@ class SubDevEcowittSensor(
         #     configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
         #     via_device=(DOMAIN, f"{device_name}"),
         # )
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_name}")},
-            manufacturer="Ecowitt",
-            name=f"{device_name}",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
-        )
+        self._attr_device_info = coordinator.device_info()
         self._attr_unique_id = f"{device_name}_{description.key}"
         self.entity_description = description
 
-    def _parse_timestamp(self, val: str) -> datetime | None:
-        """Parse a timestamp string in known formats."""
-        for fmt in self._TIMESTAMP_FORMATS:
-            try:
-                naive_dt = datetime.strptime(val, fmt)
-                if naive_dt.year < 2000:
-                    return None
-                return dt_util.as_utc(naive_dt)
-            except ValueError:
-                continue
-        return None
 
-    @property
-    def native_value(self) -> str | int | float | datetime | None:
-        """Return the state."""
-        val = self.coordinator.data.get(self.entity_description.key)
-        if (
-            self.entity_description.device_class == SensorDeviceClass.BATTERY
-            and val == "DC"
-        ):
-            return 100
-        if (
-            self.entity_description.device_class == SensorDeviceClass.TIMESTAMP
-            and isinstance(val, str)
-        ):
-            return self._parse_timestamp(val)
-        return val
+class SubDevAggregateSensor(EcowittSensorBase):
+    """One entity for a whole sub-device in compact mode.
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return entity specific state attributes."""
-        attrs = {}
-        val = self.coordinator.data.get(self.entity_description.key)
-        if (
-            self.entity_description.device_class == SensorDeviceClass.BATTERY
-            and val == "DC"
-        ):
-            attrs["power_source"] = "DC"
-        last_seen = self.coordinator.data.get("_last_seen")
-        if last_seen is not None:
-            attrs["last_seen"] = last_seen
-        return attrs or None
+    The state is the sub-device's primary reading; its other readings,
+    including battery and signal, are attributes keyed by payload key.
+    """
+
+    def __init__(
+        self,
+        coordinator: EcowittDataUpdateCoordinator,
+        device_name: str,
+        sensor_type: str,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator, context=sub_device_context(sensor_type))
+        self._attr_device_info = coordinator.device_info()
+        self._attr_unique_id = f"{device_name}_{sensor_type}"
+        self.entity_description = description
+        self._reading_keys = sub_device_groups()[sensor_type][1:]
+
+    def _refresh_derived(self) -> None:
+        if self.coordinator.generation == self._cache_generation:
+            return
+        super()._refresh_derived()
+        data = self.coordinator.data
+        readings = {key: data[key] for key in self._reading_keys if key in data}
+        self._cached_attrs = {**readings, **(self._cached_attrs or {})} or None
+
+    def _gated_value(self) -> Any:
+        """Publish when any reading of the sub-device changes."""
+        return (self._cached_value, self._cached_attrs)
 
     @property
-    def icon(self) -> str | None:
-        """Return the icon to use in the frontend, if any."""
-        val = self.coordinator.data.get(self.entity_description.key)
-        if self.entity_description.device_class == SensorDeviceClass.BATTERY:
-            if val == "DC":
-                return "mdi:power-plug"
-            try:
-                # 支持 20, 40, 60, 80, 100 阶梯动态图标
-                level = int(val)
-                if level <= 10:
-                    return "mdi:battery-outline"
-                if level <= 30:
-                    return "mdi:battery-20"
-                if level <= 50:
-                    return "mdi:battery-40"
-                if level <= 70:
-                    return "mdi:battery-60"
-                if level <= 90:
-                    return "mdi:battery-80"
-                return "mdi:battery"
-            except (ValueError, TypeError):
-                pass
-        return super().icon
+    def available(self) -> bool:
+        """Return True while any reading of the sub-device is reported."""
+        data = self.coordinator.data
+        return super().available and (
+            self.entity_description.key in data
+            or any(key in data for key in self._reading_keys)
+        )
 
 
-class IotDeviceSensor(CoordinatorEntity, SensorEntity):
+class IotDeviceSensor(EcowittSensorBase):
     """表示 IoT 设备的传感器实体"""
 
-    _attr_has_entity_name = True
-
     def __init__(
         self,
         coordinator: EcowittDataUpdateCoordinator,
@@ -1067,105 +940,63 @@ class IotDeviceSensor(CoordinatorEntity, SensorEntity):
         unique_id: str,
     ) -> None:
         """初始化 IoT 设备传感器"""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=iot_context(device_id))
         self.device_id = device_id
         self.entity_description = description
         self._attr_unique_id = f"{device_id}_{description.key}"
 
         # 设置设备信息
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_id}")},
-            name=f"{device_id}",
-            manufacturer="Ecowitt",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
-            via_device=(DOMAIN, unique_id),
-        )
+        self._attr_device_info = coordinator.device_info(device_id)
+        self._record_key = description.key[len(device_id) + 1 :]
 
-    @property
-    def native_value(self) -> str | int | float | None:
-        """获取传感器值"""
-        # # 从协调器获取设备数据
-        val = None
-        if "iot_list" in self.coordinator.data:
-            iot_data = self.coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                if nickname == self.device_id:
-                    key = self.entity_description.key.split("_", 1)[1]
-                    val = item.get(key, None)
-                    break
+    def _publish_key(self) -> str:
+        """Return the IoT record field, shared by all devices."""
+        return self._record_key
 
-        if (
-            self.entity_description.device_class == SensorDeviceClass.BATTERY
-            and val == "DC"
-        ):
-            return 100
-        return val
+    def _raw_value(self) -> Any:
+        """Return this sensor's field from the device's IoT record."""
+        item = self.coordinator.iot_by_nickname.get(self.device_id)
+        if item is None:
+            return None
+        return item.get(self._record_key)
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return entity specific state attributes."""
-        attrs = {}
-        val = None
-        if "iot_list" in self.coordinator.data:
-            iot_data = self.coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                if nickname == self.device_id:
-                    key = self.entity_description.key.split("_", 1)[1]
-                    val = item.get(key, None)
-                    break
 
-        if (
-            self.entity_description.device_class == SensorDeviceClass.BATTERY
-            and val == "DC"
-        ):
-            attrs["power_source"] = "DC"
-        last_seen = self.coordinator.data.get("_last_seen")
-        if last_seen is not None:
-            attrs["last_seen"] = last_seen
-        return attrs or None
+class GatewayLastSeenSensor(
+    CoordinatorEntity[EcowittDataUpdateCoordinator], SensorEntity
+):
+    """When the gateway, and each of its sub-devices, last reported data.
+
+    The only entity that tracks freshness, so the periodic last-seen stamp
+    writes one state instead of touching every entity of the gateway.
+    """
+
+    _attr_has_entity_name = True
+    _attr_translation_key = "last_seen"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: EcowittDataUpdateCoordinator,
+        device_name: str,
+    ) -> None:
+        """Initialize."""
+        super().__init__(coordinator, context=LAST_SEEN_CONTEXT)
+        self._attr_device_info = coordinator.device_info()
+        self._attr_unique_id = f"{device_name}_last_seen"
 
     @property
-    def icon(self) -> str | None:
-        """Return the icon to use in the frontend, if any."""
-        val = None
-        if "iot_list" in self.coordinator.data:
-            iot_data = self.coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                if nickname == self.device_id:
-                    key = self.entity_description.key.split("_", 1)[1]
-                    val = item.get(key, None)
-                    break
+    def native_value(self) -> datetime | None:
+        """Return when the gateway last answered, at the stamp's granularity."""
+        last_seen = self.coordinator.data.get(LAST_SEEN_CONTEXT)
+        if not last_seen:
+            return None
+        return dt_util.utc_from_timestamp(last_seen)
 
-        if self.entity_description.device_class == SensorDeviceClass.BATTERY:
-            if val == "DC":
-                return "mdi:power-plug"
-            try:
-                # 支持 20, 40, 60, 80, 100 阶梯动态图标
-                level = int(val)
-                if level <= 10:
-                    return "mdi:battery-outline"
-                if level <= 30:
-                    return "mdi:battery-20"
-                if level <= 50:
-                    return "mdi:battery-40"
-                if level <= 70:
-                    return "mdi:battery-60"
-                if level <= 90:
-                    return "mdi:battery-80"
-                return "mdi:battery"
-            except (ValueError, TypeError):
-                pass
-        return super().icon
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return when each sub-device or IoT device last changed a reading."""
+        return {
+            name: dt_util.utc_from_timestamp(seen).isoformat()
+            for name, seen in sorted(self.coordinator.sub_device_seen.items())
+        } or None
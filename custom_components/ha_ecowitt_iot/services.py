@@ -0,0 +1,136 @@
+"""Services of the Ecowitt Official Integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import EcowittDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_IOT_DEVICES = "set_iot_devices"
+ATTR_TURN_ON = "turn_on"
+ATTR_TURN_OFF = "turn_off"
+
+SET_IOT_DEVICES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_TURN_ON, default=list): cv.entity_ids,
+        vol.Optional(ATTR_TURN_OFF, default=list): cv.entity_ids,
+    }
+)
+
+
+def _resolve_targets(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[EcowittDataUpdateCoordinator, dict[str, bool]]:
+    """Map the called switches to their gateway and IoT device nickname."""
+    turn_on, turn_off = call.data[ATTR_TURN_ON], call.data[ATTR_TURN_OFF]
+    if both := set(turn_on) & set(turn_off):
+        raise ServiceValidationError(
+            f"Cannot turn {', '.join(sorted(both))} both on and off"
+        )
+
+    entity_reg = er.async_get(hass)
+    device_reg = dr.async_get(hass)
+    coordinators = hass.data.get(DOMAIN, {})
+    targets: dict[EcowittDataUpdateCoordinator, dict[str, bool]] = {}
+    for state, entity_ids in ((True, turn_on), (False, turn_off)):
+        for entity_id in entity_ids:
+            entry = entity_reg.async_get(entity_id)
+            coordinator = nickname = None
+            if (
+                entry is not None
+                and entry.platform == DOMAIN
+                and entry.domain == Platform.SWITCH
+                and entry.device_id
+            ):
+                coordinator = coordinators.get(entry.config_entry_id)
+                if device := device_reg.async_get(entry.device_id):
+                    nickname = next(
+                        (value for domain, value in device.identifiers if domain == DOMAIN),
+                        None,
+                    )
+            if coordinator is None or nickname not in coordinator.iot_by_nickname:
+                raise ServiceValidationError(
+                    f"{entity_id} is not a switch of a loaded Ecowitt IoT device"
+                )
+            targets.setdefault(coordinator, {})[nickname] = state
+    return targets
+
+
+async def _async_set_gateway_devices(
+    coordinator: EcowittDataUpdateCoordinator, targets: dict[str, bool]
+) -> list[str]:
+    """Send one gateway's commands, then confirm them together.
+
+    The commands are queued at once; the gateway's request queue sends them
+    one at a time, ahead of pending reads (see request_queue.py). wittiot
+    does not report a rejected command, so only the confirming re-reads
+    tell whether a device switched.
+
+    Returns the nicknames that did not reach their commanded state.
+    """
+    results = await asyncio.gather(
+        *(
+            coordinator.async_switch_iot_device(nickname, state)
+            for nickname, state in targets.items()
+        ),
+        return_exceptions=True,
+    )
+    sent: dict[str, bool] = {}
+    failed: list[str] = []
+    for (nickname, state), result in zip(targets.items(), results):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+        if isinstance(result, BaseException):
+            _LOGGER.warning("Switching %s failed: %s", nickname, result)
+            failed.append(nickname)
+        else:
+            sent[nickname] = state
+
+    # Each round re-reads only the devices still pending, one read_device
+    # request per device, instead of a full poll (which itself reads every
+    # IoT device) per device.
+    if sent:
+        failed.extend(await coordinator.async_confirm_iot_states(sent))
+    return failed
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_set_iot_devices(call: ServiceCall) -> None:
+        """Switch several IoT devices, batched per gateway."""
+        targets = _resolve_targets(hass, call)
+        results = await asyncio.gather(
+            *(
+                _async_set_gateway_devices(coordinator, devices)
+                for coordinator, devices in targets.items()
+            )
+        )
+        if failed := sorted(nickname for names in results for nickname in names):
+            raise HomeAssistantError(
+                f"{', '.join(failed)} did not reach the commanded state"
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_IOT_DEVICES,
+        async_set_iot_devices,
+        schema=SET_IOT_DEVICES_SCHEMA,
+    )
@@ -1,21 +1,16 @@
 import logging
-import time
 from wittiot import API
 import asyncio
-import dataclasses
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.const import EntityCategory
-from homeassistant.helpers.event import async_call_later
-from homeassistant.const import (
-    CONF_HOST,
-)
+from homeassistant.const import Platform
 from .const import DOMAIN
-from .coordinator import EcowittDataUpdateCoordinator
+from .coordinator import EcowittDataUpdateCoordinator, iot_context
+from .entity_table import async_setup_discovery
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,69 +27,7 @@ async def async_setup_entry(
 ) -> None:
     """设置开关平台."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-
-    # 为每个设备创建开关实体
-    switches = []
-    registered_switches: set[str] = set()
-    if "iot_list" in coordinator.data:
-        iot_data = coordinator.data["iot_list"]
-        commands = iot_data["command"]
-        desc_map = {desc.key: desc for desc in SWITCH_DESCRIPTIONS}
-        for i, item in enumerate(commands):
-            rfnet_state = item.get("rfnet_state")
-            if rfnet_state == 0:
-                continue
-            for key in list(item):
-                if key in desc_map:
-                    desc = desc_map[key]
-                    device_desc = dataclasses.replace(
-                        desc,
-                        key=f"{item.get('nickname')}_{desc.key}",
-                    )
-                    switches.append(
-                        EcowittSwitch(
-                            coordinator=coordinator,
-                            device_id=item.get("nickname"),
-                            description=device_desc,
-                            unique_id=entry.unique_id,
-                        )
-                    )
-                    registered_switches.add(f"{item.get('nickname')}_{desc.key}")
-    async_add_entities(switches)
-    async def _process_new_switches() -> None:
-        new_entities: list[SwitchEntity] = []
-        if "iot_list" in coordinator.data:
-            iot_data = coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            desc_map = {desc.key: desc for desc in SWITCH_DESCRIPTIONS}
-            for i, item in enumerate(commands):
-                rfnet_state = item.get("rfnet_state")
-                if rfnet_state == 0:
-                    continue
-                nickname = item.get("nickname")
-                if nickname is None:
-                    continue
-                for key in list(item):
-                    if key in desc_map:
-                        desc = desc_map[key]
-                        composed_key = f"{nickname}_{desc.key}"
-                        if composed_key not in registered_switches:
-                            device_desc = dataclasses.replace(
-                                desc,
-                                key=composed_key,
-                            )
-                            new_entities.append(
-                                EcowittSwitch(
-                                    coordinator=coordinator,
-                                    device_id=nickname,
-                                    description=device_desc,
-                                    unique_id=entry.unique_id,
-                                )
-                            )
-                            registered_switches.add(composed_key)
-        if new_entities:
-            async_add_entities(new_entities)
-    coordinator.async_add_listener(lambda: hass.async_create_task(_process_new_switches()))
+    async_setup_discovery(coordinator, entry, Platform.SWITCH, async_add_entities)
 
 
 class EcowittSwitch(CoordinatorEntity, SwitchEntity):
@@ -108,41 +41,21 @@ class EcowittSwitch(CoordinatorEntity, SwitchEntity):
         unique_id: str,
     ) -> None:
         """表示Ecowitt设备的开关实体."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=iot_context(device_id))
         self.device_id = device_id
         self.entity_description = description
         self._attr_unique_id = f"{device_id}_{description.key}"
 
-        self._pending_state = None  # 跟踪待确认的状态
-        self._pending_timestamp = None  # 记录状态改变的时间
-        self._timeout_handle = None  # 超时处理句柄
+        self._pending_state: bool | None = None  # 跟踪待确认的状态
+        self._confirm_task: asyncio.Task | None = None  # 状态确认任务
         # 设置设备信息
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_id}")},
-            name=f"{device_id}",
-            manufacturer="Ecowitt",
-            model=coordinator.data["ver"],
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
-            via_device=(DOMAIN, unique_id),
-        )
-
-        if "iot_list" in self.coordinator.data:
-            iot_data = self.coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for i, item in enumerate(commands):
-                nickname = item.get("nickname")
-                rfnet_state = item.get("rfnet_state")
-                if rfnet_state == 0:
-                    continue
-                if nickname == self.device_id:
-                    # key = self.entity_description.key.split("_", 1)[1]
-                    self._iot_id = item.get("id")
-                    self._iot_model = item.get("model")
-                    # self._iot_is_on = item.get("iot_running")
+        self._attr_device_info = coordinator.device_info(device_id)
 
     @property
     def is_on(self) -> bool | None:
-        """从协调器获取设备数据."""
+        """从协调器获取设备数据；命令待确认时显示目标状态."""
+        if self._pending_state is not None:
+            return self._pending_state
         return self._get_actual_state()
 
     async def async_turn_on(self, **kwargs):
@@ -153,70 +66,52 @@ class EcowittSwitch(CoordinatorEntity, SwitchEntity):
         """关闭设备."""
         await self._async_set_state(False)
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop a running confirmation."""
+        await super().async_will_remove_from_hass()
+        if self._confirm_task:
+            task, self._confirm_task = self._confirm_task, None
+            task.cancel()
+
     def _get_actual_state(self) -> bool | None:
         """从协调器获取实际设备状态；找不到或掉线时返回 None 以显示为 unknown/unavailable."""
-        if "iot_list" in self.coordinator.data:
-            iot_data = self.coordinator.data["iot_list"]
-            commands = iot_data["command"]
-            for item in commands:
-                nickname = item.get("nickname")
-                rfnet_state = item.get("rfnet_state")
-                if rfnet_state == 0:
-                    continue
-                if nickname == self.device_id:
-                    return bool(item.get("iot_running", 0))
-        return None
+        item = self.coordinator.iot_by_nickname.get(self.device_id)
+        if item is None or item.get("rfnet_state") == 0:
+            return None
+        return bool(item.get("iot_running", 0))
 
     async def _async_set_state(self, state: bool):
         """设置设备状态（带待处理状态管理）"""
-        # 取消之前的超时检查
-        if self._timeout_handle:
-            self._timeout_handle()
-            self._timeout_handle = None
-
-        # 设置待处理状态
-        self._pending_state = state
-        self._pending_timestamp = time.time()
+        # 取消之前的状态确认
+        if self._confirm_task:
+            task, self._confirm_task = self._confirm_task, None
+            task.cancel()
 
         # 乐观更新：立即改变UI状态
-        self._attr_is_on = state
+        self._pending_state = state
         self.async_write_ha_state()
 
         # 发送控制命令
-        state_value = 1 if state else 0
-        await self.coordinator.api.switch_iotdevice(
-            self._iot_id, self._iot_model, state_value
-        )
+        try:
+            await self.coordinator.async_switch_iot_device(self.device_id, state)
+        except BaseException:
+            self._pending_state = None
+            self.async_write_ha_state()
+            raise
 
-        # 设置状态验证超时（5秒后检查实际状态）
-        self._timeout_handle = async_call_later(
+        self._confirm_task = self.coordinator.config_entry.async_create_background_task(
             self.hass,
-            5,  # 7秒后验证状态
-            self._async_verify_state,
+            self._async_confirm_state(state),
+            f"ecowitt confirm {self.entity_id}",
         )
 
-        # 延迟1秒后请求协调器更新数据
-        await self.coordinator.async_request_refresh()
-
-    async def _async_verify_state(self, _):
-        """验证设备实际状态是否与预期一致"""
-        self._timeout_handle = None
-
-        # 获取当前实际状态
-        current_state = self._get_actual_state()
-
-        if self._pending_state == current_state:
-            # 状态匹配，清除待处理标志
-            self._pending_state = None
-            self._pending_timestamp = None
-        else:
-            # 状态不匹配，恢复实际状态
-            self._attr_is_on = current_state
-            self._pending_state = None
-            self._pending_timestamp = None
-            self.async_write_ha_state()
-            # _LOGGER.warning(
-            #     "设备状态未按预期改变。预期: %s, 实际: %s",
-            #     "开" if self._pending_state else "关",
-            #     "开" if current_state else "关",
-            # )
+    async def _async_confirm_state(self, state: bool) -> None:
+        """Re-read only this device until it reports the commanded state."""
+        try:
+            await self.coordinator.async_confirm_iot_states({self.device_id: state})
+        finally:
+            # 确认成功或超时后显示实际状态；被新命令取代时不处理
+            if self._confirm_task is asyncio.current_task():
+                self._pending_state = None
+                self._confirm_task = None
+                self.async_write_ha_state()
@@ -0,0 +1,42 @@
+"""Data tiers: payload keys refreshed apart from the live readings.
+
+wittiot only fetches the whole payload at once (request_loc_allinfo), so
+every full poll refreshes every tier and its result is kept whole. The one
+narrower endpoint, the per-device IoT read, lets push mode refresh the IoT
+records between full polls.
+"""
+
+from __future__ import annotations
+
+from wittiot import MultiSensorInfo, WittiotDataTypes
+
+# IoT device records are re-read this often between push-mode full polls.
+TIER_IOT_SECONDS = 30
+
+# Each of those re-reads is one read_device request per device. The tier is
+# stretched so a large IoT fleet costs at most one read per this many
+# seconds on average; switches commanded from Home Assistant are confirmed
+# by targeted reads anyway.
+TIER_IOT_PUSH_SECONDS_PER_DEVICE = 10
+
+_DIAGNOSTIC_DATA_TYPES = (
+    WittiotDataTypes.BATTERY,
+    WittiotDataTypes.BATTERY_BINARY,
+    WittiotDataTypes.SIGNAL,
+    WittiotDataTypes.RSSI,
+)
+
+DIAGNOSTIC_KEYS = frozenset(
+    {"ver", "devname", "mac", "con_batt", "con_batt_volt", "con_ext_volt", "piezora_batt"}
+    | {
+        key
+        for key, info in MultiSensorInfo.SENSOR_INFO.items()
+        if info["data_type"] in _DIAGNOSTIC_DATA_TYPES
+    }
+)
+
+
+def iot_push_tier_seconds(devices: int) -> float:
+    """Return how often push mode re-reads the records of this many IoT devices."""
+    return max(TIER_IOT_SECONDS, devices * TIER_IOT_PUSH_SECONDS_PER_DEVICE)
+
@@ -0,0 +1,62 @@
+"""Shared parse cache for the gateway's timestamp strings."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+TIMESTAMP_FORMATS = ("%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+# Distinct raw strings kept. Last-rain and lightning times rarely change
+# between polls, so a few per timestamp sensor is plenty.
+TIMESTAMP_CACHE_SIZE = 256
+
+
+class TimestampParser:
+    """Parse timestamps once per raw string, trying each key's known format first."""
+
+    def __init__(self, maxsize: int = TIMESTAMP_CACHE_SIZE) -> None:
+        """Initialize."""
+        self._maxsize = maxsize
+        self._cache: OrderedDict[str, datetime | None] = OrderedDict()
+        # Format that last parsed each payload key; a gateway reports every
+        # key in one format, so misses skip the failing strptime attempts.
+        self._formats: dict[str, str] = {}
+
+    def parse(self, key: str, val: str) -> datetime | None:
+        """Return val as a UTC datetime, or None if it is unset or unparsable."""
+        try:
+            result = self._cache[val]
+        except KeyError:
+            pass
+        else:
+            self._cache.move_to_end(val)
+            return result
+
+        result = self._parse(key, val)
+        self._cache[val] = result
+        if len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def _parse(self, key: str, val: str) -> datetime | None:
+        preferred = self._formats.get(key)
+        formats = TIMESTAMP_FORMATS
+        if preferred is not None:
+            formats = (preferred, *(fmt for fmt in formats if fmt != preferred))
+        for fmt in formats:
+            try:
+                naive_dt = datetime.strptime(val, fmt)
+            except ValueError:
+                continue
+            self._formats[key] = fmt
+            # 网关未记录时间时返回 1970 等占位值
+            if naive_dt.year < 2000:
+                return None
+            return dt_util.as_utc(naive_dt)
+        return None
+
+
+TIMESTAMP_PARSER = TimestampParser()
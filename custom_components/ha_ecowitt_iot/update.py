@@ -7,10 +7,7 @@ from typing import Any
 
 from homeassistant.components.update import UpdateDeviceClass, UpdateEntity, UpdateEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
-import homeassistant.helpers.device_registry as dr
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import entity_registry as er
@@ -59,29 +56,27 @@ class EcowittFirmwareUpdateEntity(CoordinatorEntity[EcowittDataUpdateCoordinator
 
     def __init__(self, coordinator: EcowittDataUpdateCoordinator, device_name: str) -> None:
         """Initialize update entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context="ver")
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}_firmware"
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{device_name}")},
-            manufacturer="Ecowitt",
-            name=f"{device_name}",
-            model=coordinator.data.get("ver"),
-            configuration_url=f"http://{coordinator.config_entry.data[CONF_HOST]}",
+        self._attr_device_info = coordinator.device_info()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to firmware metadata refreshes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.firmware.async_add_listener(self.async_write_ha_state)
         )
-        mac = coordinator.data.get("mac")
-        if mac:
-            self._attr_device_info["connections"] = {(dr.CONNECTION_NETWORK_MAC, dr.format_mac(mac))}
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        firmware = self.coordinator.data.get("firmware_update")
+        firmware = self.coordinator.firmware.info
         return super().available and isinstance(firmware, dict) and firmware.get("check_supported", False)
 
     @property
     def installed_version(self) -> str | None:
         """Version currently installed on the device."""
-        firmware = self.coordinator.data.get("firmware_update", {})
+        firmware = self.coordinator.firmware.info
         if isinstance(firmware, dict):
             installed = _normalize_version(firmware.get("installed_version"))
             if installed:
@@ -91,7 +86,7 @@ class EcowittFirmwareUpdateEntity(CoordinatorEntity[EcowittDataUpdateCoordinator
     @property
     def latest_version(self) -> str | None:
         """Latest available firmware version."""
-        firmware = self.coordinator.data.get("firmware_update", {})
+        firmware = self.coordinator.firmware.info
         if not isinstance(firmware, dict):
             return None
         latest = _normalize_version(firmware.get("latest_version"))
@@ -102,7 +97,7 @@ class EcowittFirmwareUpdateEntity(CoordinatorEntity[EcowittDataUpdateCoordinator
     @property
     def release_summary(self) -> str | None:
         """Summary of the latest release."""
-        firmware = self.coordinator.data.get("firmware_update", {})
+        firmware = self.coordinator.firmware.info
         if not isinstance(firmware, dict):
             return None
         summary = firmware.get("release_summary")
@@ -113,7 +108,7 @@ class EcowittFirmwareUpdateEntity(CoordinatorEntity[EcowittDataUpdateCoordinator
     @property
     def supported_features(self) -> UpdateEntityFeature:
         """Return supported features for firmware update."""
-        firmware = self.coordinator.data.get("firmware_update", {})
+        firmware = self.coordinator.firmware.info
         if not isinstance(firmware, dict):
             return UpdateEntityFeature(0)
         if firmware.get("install_supported", False):
@@ -123,7 +118,7 @@ class EcowittFirmwareUpdateEntity(CoordinatorEntity[EcowittDataUpdateCoordinator
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra diagnostics for unsupported update paths."""
-        firmware = self.coordinator.data.get("firmware_update")
+        firmware = self.coordinator.firmware.info
         if not isinstance(firmware, dict):
             return {"check_supported": False, "reason": "firmware metadata unavailable"}
         attrs: dict[str, Any] = {"check_supported": firmware.get("check_supported", False), "install_supported": firmware.get("install_supported", False)}
@@ -136,9 +131,10 @@ class EcowittFirmwareUpdateEntity(CoordinatorEntity[EcowittDataUpdateCoordinator
     async def async_install(self, version: str | None, backup: bool) -> None:
         """Install latest firmware update."""
         del version, backup
-        await self.coordinator.api.install_firmware_update()
+        await self.coordinator.firmware.async_install()
         self._attr_in_progress = True
         self.async_write_ha_state()
         await self.coordinator.async_request_refresh()
+        await self.coordinator.firmware.async_refresh()
         self._attr_in_progress = False
         self.async_write_ha_state()
@@ -0,0 +1,55 @@
+"""Shared test setup for the Ecowitt integration."""
+
+from __future__ import annotations
+
+import asyncio
+from enum import StrEnum
+import inspect
+from pathlib import Path
+import sys
+
+import pytest
+
+from homeassistant import const
+from homeassistant.components.sensor import SensorDeviceClass
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _add_member(enum: type[StrEnum], name: str, value: str) -> None:
+    member = str.__new__(enum, value)
+    member._name_ = name
+    member._value_ = value
+    setattr(enum, name, member)
+    enum._member_map_[name] = member
+    enum._value2member_map_[value] = member
+    enum._member_names_.append(name)
+
+
+# sensor.py uses the conductivity unit and device class of newer Home
+# Assistant releases; add them where the installed release predates them so
+# the module imports.
+if not hasattr(const, "UnitOfConductivity"):
+
+    class UnitOfConductivity(StrEnum):
+        """Conductivity units."""
+
+        SIEMENS_PER_CM = "S/cm"
+        MICROSIEMENS_PER_CM = "μS/cm"
+        MILLISIEMENS_PER_CM = "mS/cm"
+
+    const.UnitOfConductivity = UnitOfConductivity
+if "CONDUCTIVITY" not in SensorDeviceClass.__members__:
+    _add_member(SensorDeviceClass, "CONDUCTIVITY", "conductivity")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    """Run coroutine tests in a fresh event loop."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {
+        name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames
+    }
+    asyncio.run(pyfuncitem.obj(**kwargs))
+    return True
@@ -0,0 +1,90 @@
+"""Tests for the refresh cadence estimator behind phase-locked polling."""
+
+import math
+import random
+
+from custom_components.ha_ecowitt_iot.cadence import (
+    CADENCE_MAX_FACTOR,
+    RefreshCadenceEstimator,
+)
+
+INTERVAL = 10.0
+LATENCY = 0.3
+
+
+def _simulate(period: float, hours: float, seed: int = 1):
+    """Poll a gateway refreshing three readings every period seconds.
+
+    A refresh leaves a reading unchanged one time in five. Returns the
+    estimator, the delays it asked for and, per refresh, how long it took
+    a poll to see it.
+    """
+    rng = random.Random(seed)
+    phase = rng.uniform(0, period)
+    estimator = RefreshCadenceEstimator()
+    values = [0, 0, 0]
+    seen = -1
+    now = 0.0
+    delays: list[float | None] = []
+    detections: list[float] = []
+    while now < hours * 3600:
+        delay = estimator.next_delay(now, INTERVAL)
+        delays.append(delay)
+        start = now + (INTERVAL if delay is None else delay)
+        read = start + LATENCY / 2
+        now = start + LATENCY
+        refresh = math.floor((read - phase) / period)
+        changed = set()
+        for cycle in range(seen + 1, refresh + 1):
+            detections.append(read - (phase + cycle * period))
+            for index in range(len(values)):
+                if rng.random() > 0.2:
+                    values[index] += 1
+                    changed.add(f"key{index}")
+        seen = max(seen, refresh)
+        estimator.record(start, now, changed)
+    return estimator, delays, detections
+
+
+def test_learns_period_without_ratcheting() -> None:
+    """The period stays on the real one; scheduling lag does not creep in."""
+    estimator, delays, _ = _simulate(30.0, hours=4)
+
+    periods = estimator.as_dict()
+    assert periods
+    assert all(abs(period - 30.0) < 0.5 for period in periods.values())
+    assert all(
+        INTERVAL <= delay <= INTERVAL * CADENCE_MAX_FACTOR
+        for delay in delays
+        if delay is not None
+    )
+
+
+def test_locked_polls_land_just_after_refresh() -> None:
+    """Fewer polls than the fixed interval, seeing refreshes as early."""
+    _, delays, detections = _simulate(45.0, hours=4)
+
+    locked = sum(delay is not None for delay in delays)
+    assert locked > len(delays) / 4
+    assert len(delays) < 4 * 3600 / INTERVAL * 0.6
+    # Polling blindly every interval sees a refresh after interval / 2.
+    settled = detections[len(detections) // 4 :]
+    assert sum(settled) / len(settled) < INTERVAL / 2
+    assert min(settled) >= 0
+
+
+def test_slow_refresh_gets_intermediate_poll() -> None:
+    """A period beyond the longest delay still lands on the refresh."""
+    _, delays, detections = _simulate(120.0, hours=4)
+
+    assert any(delay is not None for delay in delays)
+    settled = detections[len(detections) // 4 :]
+    assert sum(settled) / len(settled) < INTERVAL
+
+
+def test_refresh_faster_than_interval_never_polls_faster() -> None:
+    """A cadence the interval cannot resolve leaves polling unchanged."""
+    _, delays, _ = _simulate(8.8, hours=1)
+
+    assert all(delay is None or delay >= INTERVAL for delay in delays)
+
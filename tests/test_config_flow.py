@@ -0,0 +1,64 @@
+"""Tests for validating a gateway in the config flow."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.ha_ecowitt_iot import config_flow
+from custom_components.ha_ecowitt_iot.request_queue import GatewayRequestQueue
+
+
+class _Api:
+    def __init__(self, host: str, session: object) -> None:
+        self.host = host
+
+    async def request_loc_info(self) -> dict:
+        return {"dev_name": "GW2000A"}
+
+    async def request_loc_allinfo(self) -> dict:
+        return {"mac": "AA:BB"}
+
+
+@pytest.fixture
+def queue(monkeypatch: pytest.MonkeyPatch) -> GatewayRequestQueue:
+    queue = GatewayRequestQueue()
+    monkeypatch.setattr(config_flow, "API", _Api)
+    monkeypatch.setattr(config_flow, "async_get_request_queue", lambda hass, host: queue)
+    monkeypatch.setattr(
+        config_flow.aiohttp_client, "async_get_clientsession", lambda hass: None
+    )
+    monkeypatch.setattr(config_flow, "VALIDATION_TIMEOUT_SECONDS", 0.05)
+    return queue
+
+
+async def test_busy_gateway_does_not_time_out_validation(
+    queue: GatewayRequestQueue,
+) -> None:
+    """Waiting behind the coordinator's requests does not count as a timeout."""
+    busy = asyncio.create_task(queue.async_call(lambda: asyncio.sleep(0.2)))
+    await asyncio.sleep(0)
+
+    devices, all_info = await config_flow._async_probe_gateway(MagicMock(), "gw")
+
+    assert devices == {"dev_name": "GW2000A"}
+    assert all_info == {"mac": "AA:BB"}
+    await busy
+
+
+async def test_hung_read_still_times_out(
+    queue: GatewayRequestQueue, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The timeout still bounds the read itself once its turn comes."""
+
+    class _HungApi(_Api):
+        async def request_loc_info(self) -> dict:
+            await asyncio.sleep(1)
+            return {}
+
+    monkeypatch.setattr(config_flow, "API", _HungApi)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await config_flow._async_probe_gateway(MagicMock(), "gw")
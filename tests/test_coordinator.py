@@ -0,0 +1,235 @@
+"""Tests for the coordinator's shared refreshes, driven by a fake gateway."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.ha_ecowitt_iot import coordinator as coordinator_module
+from custom_components.ha_ecowitt_iot.scheduler import MAX_CONCURRENT_POLLS
+from custom_components.ha_ecowitt_iot.services import _async_set_gateway_devices
+from custom_components.ha_ecowitt_iot.coordinator import EcowittDataUpdateCoordinator
+from custom_components.ha_ecowitt_iot.const import CONF_PUSH_MODE
+from custom_components.ha_ecowitt_iot.switch import SWITCH_DESCRIPTIONS, EcowittSwitch
+from custom_components.ha_ecowitt_iot.tiers import iot_push_tier_seconds
+
+MAC = "AA:BB:CC:DD:EE:FF"
+DEVICES = 20
+
+
+class _FakeApi:
+    """A gateway with DEVICES IoT switches that counts its HTTP requests."""
+
+    def __init__(self, host: str, session: object = None) -> None:
+        self.requests: Counter[str] = Counter()
+        self.running = {index: 0 for index in range(DEVICES)}
+        self.readings: dict[str, Any] = {"tempinf": 70.0}
+        # Devices that ignore commands; the gateway still answers 200.
+        self.stuck: set[int] = set()
+
+    def _records(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "nickname": f"valve{index}",
+                "id": index,
+                "model": 1,
+                "rfnet_state": 1,
+                "iot_running": running,
+            }
+            for index, running in self.running.items()
+        ]
+
+    async def request_loc_allinfo(self) -> dict[str, Any]:
+        self.requests["get_livedata_info"] += 1
+        await asyncio.sleep(0.01)
+        return {"mac": MAC, **self.readings, "iot_list": {"command": self._records()}}
+
+    async def switch_iotdevice(self, iot_id: int, model: int, switch: int) -> None:
+        self.requests["quick_run"] += 1
+        await asyncio.sleep(0.001)
+        if iot_id not in self.stuck:
+            self.running[iot_id] = switch
+
+    async def update_single_device(self, command: dict[str, Any]) -> list[dict]:
+        # wittiot sends one read_device POST per record.
+        for item in command["command"]:
+            self.requests["read_device"] += 1
+            await asyncio.sleep(0.001)
+            item["iot_running"] = self.running[item["id"]]
+        return command["command"]
+
+
+async def _async_coordinator(
+    path: Path, **options: Any
+) -> EcowittDataUpdateCoordinator:
+    hass = HomeAssistant(str(path))
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain="ha_ecowitt_iot",
+        title="GW2000A",
+        data={"host": "192.0.2.1", "mac": MAC, **options},
+        source="user",
+        unique_id="GW2000A",
+        entry_id="gateway",
+    )
+    coordinator = EcowittDataUpdateCoordinator(hass, entry)
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    coordinator.api.requests.clear()
+    return coordinator
+
+
+@pytest.fixture(autouse=True)
+def _fake_gateway(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(coordinator_module, "API", _FakeApi)
+    monkeypatch.setattr(
+        coordinator_module, "async_get_clientsession", lambda hass: None
+    )
+    monkeypatch.setattr(coordinator_module, "IOT_CONFIRM_INITIAL_DELAY", 0.01)
+
+
+async def test_concurrent_refresh_requests_share_one_fetch(tmp_path: Path) -> None:
+    coordinator = await _async_coordinator(tmp_path)
+    coordinator.refresh_window = 0.05
+
+    await asyncio.gather(*(coordinator.async_request_refresh() for _ in range(20)))
+
+    assert coordinator.api.requests == {"get_livedata_info": 1}
+
+
+async def test_request_after_fetch_started_gets_its_own(tmp_path: Path) -> None:
+    coordinator = await _async_coordinator(tmp_path)
+    coordinator.refresh_window = 0.01
+
+    first = asyncio.create_task(coordinator.async_request_refresh())
+    while not coordinator.api.requests:
+        await asyncio.sleep(0.001)
+    # The shared fetch is running; this request wants data read after it.
+    await coordinator.async_request_refresh()
+    await first
+
+    assert coordinator.api.requests == {"get_livedata_info": 2}
+
+
+async def test_twenty_switch_toggles_are_bounded(tmp_path: Path) -> None:
+    """Concurrent toggles cost one command and one read per device, no poll."""
+    coordinator = await _async_coordinator(tmp_path)
+    switches = []
+    for index in range(DEVICES):
+        switch = EcowittSwitch(
+            coordinator, f"valve{index}", SWITCH_DESCRIPTIONS[0], f"valve{index}"
+        )
+        switch.hass = coordinator.hass
+        switch.entity_id = f"switch.valve{index}"
+        switch.async_write_ha_state = lambda: None
+        switches.append(switch)
+
+    await asyncio.gather(*(switch.async_turn_on() for switch in switches))
+    await asyncio.gather(*(switch._confirm_task for switch in switches))
+
+    assert all(switch.is_on for switch in switches)
+    assert coordinator.api.requests == {"quick_run": DEVICES, "read_device": DEVICES}
+
+
+async def test_push_mode_reads_iot_devices_one_request_each(tmp_path: Path) -> None:
+    """Each device read is its own latency sample, apart from full polls."""
+    coordinator = await _async_coordinator(tmp_path, **{CONF_PUSH_MODE: True})
+
+    await coordinator.async_refresh()
+
+    assert coordinator.api.requests == {"read_device": DEVICES}
+    latency = coordinator.latency.as_dict()
+    assert latency["loc_allinfo"]["samples"] == 1
+    assert latency["iot_read"]["samples"] == DEVICES
+    # Twenty devices stretch the IoT tier to one read per ten seconds.
+    assert iot_push_tier_seconds(DEVICES) == DEVICES * 10
+    assert iot_push_tier_seconds(2) == 30
+
+
+async def test_full_poll_keeps_everything_it_fetched(tmp_path: Path) -> None:
+    """New diagnostic keys and fresh IoT state show up on the next poll."""
+    coordinator = await _async_coordinator(tmp_path)
+    coordinator.api.readings["wh65batt"] = 3
+    coordinator.api.running[0] = 1
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data["wh65batt"] == 3
+    assert coordinator.iot_by_nickname["valve0"]["iot_running"] == 1
+
+
+async def test_uploads_are_ignored_while_identity_mismatches(tmp_path: Path) -> None:
+    coordinator = await _async_coordinator(tmp_path, **{CONF_PUSH_MODE: True})
+    coordinator.async_handle_push({"tempinf": 71.0})
+    assert coordinator.data["tempinf"] == 71.0
+
+    coordinator._mismatch_notified = True
+    coordinator.async_handle_push({"tempinf": 72.0})
+
+    assert coordinator.data["tempinf"] == 71.0
+
+
+async def test_batch_reports_devices_that_did_not_switch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A command the gateway accepted but the device ignored is a failure."""
+    monkeypatch.setattr(coordinator_module, "IOT_CONFIRM_TIMEOUT", 0.05)
+    coordinator = await _async_coordinator(tmp_path)
+    coordinator.api.stuck.add(1)
+
+    failed = await _async_set_gateway_devices(
+        coordinator, {"valve0": True, "valve1": True}
+    )
+
+    assert failed == ["valve1"]
+    assert coordinator.iot_by_nickname["valve0"]["iot_running"] == 1
+
+
+async def test_control_commands_skip_the_fleet_cap(tmp_path: Path) -> None:
+    """Polls of other gateways holding every fleet slot do not delay a switch."""
+    coordinator = await _async_coordinator(tmp_path)
+    for _ in range(MAX_CONCURRENT_POLLS):
+        await coordinator.scheduler.semaphore.acquire()
+
+    await asyncio.wait_for(coordinator.async_switch_iot_device("valve0", True), 1)
+    poll = asyncio.create_task(coordinator.async_refresh())
+    await asyncio.sleep(0.05)
+
+    assert coordinator.api.requests == {"quick_run": 1}
+    coordinator.scheduler.semaphore.release()
+    await poll
+    assert coordinator.api.requests["get_livedata_info"] == 1
+
+
+async def test_restored_entities_wait_for_a_verified_poll(tmp_path: Path) -> None:
+    """A snapshot seeds entities but serves nothing until the MAC is checked."""
+    coordinator = await _async_coordinator(tmp_path, **{CONF_PUSH_MODE: True})
+    snapshot = dict(coordinator.data)
+    restarted = EcowittDataUpdateCoordinator(coordinator.hass, coordinator.config_entry)
+    restarted._store.async_load = lambda: asyncio.sleep(0, snapshot)
+
+    assert await restarted.async_restore_snapshot()
+    assert not restarted.last_update_success
+    restarted.async_handle_push({"tempinf": 71.0})
+    assert restarted.data["tempinf"] == 70.0
+
+    restarted.hass.services.async_register(
+        "persistent_notification", "dismiss", lambda call: None
+    )
+    restarted.api.readings["mac"] = "11:22:33:44:55:66"
+    await restarted.async_refresh()
+    assert not restarted.last_update_success
+
+    del restarted.api.readings["mac"]
+    await restarted.async_refresh()
+    assert restarted.last_update_success
+    restarted.async_handle_push({"tempinf": 71.0})
+    assert restarted.data["tempinf"] == 71.0
@@ -0,0 +1,127 @@
+"""Tests and a memory benchmark for state shared between entities."""
+
+from __future__ import annotations
+
+from functools import partial
+from types import SimpleNamespace
+import tracemalloc
+from typing import Any
+
+from wittiot import MultiSensorInfo
+
+from homeassistant.const import Platform
+
+from custom_components.ha_ecowitt_iot.binary_sensor import (
+    IOT_BINARYSENSOR_DESCRIPTIONS,
+    LEAK_DETECTION_SENSOR,
+    IotDeviceBinarySensor,
+    SubDevEcowittBinarySensor,
+)
+from custom_components.ha_ecowitt_iot.coordinator import EcowittDataUpdateCoordinator
+from custom_components.ha_ecowitt_iot.entity_table import (
+    KeyRoute,
+    _create_entity,
+    _create_iot_entity,
+)
+from custom_components.ha_ecowitt_iot.switch import SWITCH_DESCRIPTIONS, EcowittSwitch
+
+GATEWAY = "GW2000A"
+# Three entities per IoT device plus the gateway's leak and battery keys
+# make a gateway of about 1000 entities.
+IOT_DEVICES = 330
+
+SUB_DEVICE_ROUTES = [
+    (
+        key,
+        KeyRoute(
+            Platform.BINARY_SENSOR,
+            SubDevEcowittBinarySensor,
+            LEAK_DETECTION_SENSOR[info["data_type"]],
+            info["dev_type"],
+        ),
+    )
+    for key, info in MultiSensorInfo.SENSOR_INFO.items()
+    if info["data_type"] in LEAK_DETECTION_SENSOR
+]
+IOT_ROUTES = [
+    *(
+        KeyRoute(Platform.BINARY_SENSOR, IotDeviceBinarySensor, desc)
+        for desc in IOT_BINARYSENSOR_DESCRIPTIONS
+    ),
+    *(KeyRoute(Platform.SWITCH, EcowittSwitch, desc) for desc in SWITCH_DESCRIPTIONS),
+]
+
+
+class _Uncached(dict):
+    """Device info cache that never keeps an entry, as before sharing."""
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        pass
+
+
+def _coordinator(device_infos: dict) -> SimpleNamespace:
+    coordinator = SimpleNamespace(
+        data={"ver": "GW2000A_V3.1.4", "mac": "AA:BB:CC:DD:EE:FF"},
+        config_entry=SimpleNamespace(unique_id=GATEWAY),
+        host="192.0.2.1",
+        iot_by_nickname={},
+        _device_infos=device_infos,
+    )
+    coordinator.device_info = partial(
+        EcowittDataUpdateCoordinator.device_info, coordinator
+    )
+    return coordinator
+
+
+def _gateway(coordinator: SimpleNamespace) -> list:
+    entities = [
+        _create_entity(route, coordinator, GATEWAY, key)
+        for key, route in SUB_DEVICE_ROUTES
+    ]
+    entities.extend(
+        _create_iot_entity(route, coordinator, GATEWAY, f"valve_{index}")
+        for index in range(IOT_DEVICES)
+        for route in IOT_ROUTES
+    )
+    return entities
+
+
+def test_entities_share_device_info_and_descriptions() -> None:
+    coordinator = _coordinator({})
+    entities = _gateway(coordinator)
+    rediscovered = _gateway(coordinator)
+
+    gateway = {id(entity.device_info) for entity in entities[: len(SUB_DEVICE_ROUTES)]}
+    assert len(gateway) == 1
+    iot = {id(entity.device_info) for entity in entities[len(SUB_DEVICE_ROUTES) :]}
+    assert len(iot) == IOT_DEVICES
+    assert all(
+        entity.entity_description is again.entity_description
+        for entity, again in zip(entities, rediscovered)
+    )
+
+
+def _bytes_per_entity(device_infos: dict) -> float:
+    coordinator = _coordinator(device_infos)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        entities = _gateway(coordinator)
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return used / len(entities)
+
+
+def test_memory_per_entity_benchmark() -> None:
+    """Benchmark: bytes per entity of a 1000-entity synthetic gateway."""
+    # Warm the interned descriptions so both runs allocate only entities.
+    _gateway(_coordinator({}))
+    per_entity = _bytes_per_entity(_Uncached())
+    shared = _bytes_per_entity({})
+
+    print(
+        f"\nbytes per entity: own DeviceInfo {per_entity:.0f}, "
+        f"shared DeviceInfo {shared:.0f}"
+    )
+    assert shared < per_entity
@@ -0,0 +1,54 @@
+"""Tests for the payload key routing table."""
+
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.const import EntityCategory, Platform
+
+from custom_components.ha_ecowitt_iot.binary_sensor import (
+    IOT_BINARYSENSOR_DESCRIPTIONS,
+    IotDeviceBinarySensor,
+)
+from custom_components.ha_ecowitt_iot.entity_table import (
+    KeyRoute,
+    _description,
+    sub_device_groups,
+)
+from custom_components.ha_ecowitt_iot.switch import SWITCH_DESCRIPTIONS, EcowittSwitch
+from custom_components.ha_ecowitt_iot.tiers import DIAGNOSTIC_KEYS
+
+
+def _route(platform, entity_class, descriptions, key: str) -> KeyRoute:
+    description = next(desc for desc in descriptions if desc.key == key)
+    return KeyRoute(platform, entity_class, description)
+
+
+def test_iot_descriptions_are_interned_per_platform() -> None:
+    binary_route = _route(
+        Platform.BINARY_SENSOR,
+        IotDeviceBinarySensor,
+        IOT_BINARYSENSOR_DESCRIPTIONS,
+        "iot_running",
+    )
+    switch_route = _route(
+        Platform.SWITCH, EcowittSwitch, SWITCH_DESCRIPTIONS, "iot_running"
+    )
+    key = "valve_iot_running"
+
+    binary = _description(binary_route, key)
+    switch = _description(switch_route, key)
+
+    assert binary.device_class == BinarySensorDeviceClass.RUNNING
+    assert binary.entity_category == EntityCategory.DIAGNOSTIC
+    assert switch.entity_category == EntityCategory.CONFIG
+    assert switch.key == binary.key == key
+    assert _description(switch_route, key) is switch
+
+
+def test_compact_groups_have_a_reading() -> None:
+    """Sub-devices with only battery and signal keys are not aggregated."""
+    groups = sub_device_groups()
+
+    assert "Sensor Array" not in groups
+    assert "Lightning Sensor" not in groups
+    assert all(keys[0] not in DIAGNOSTIC_KEYS for keys in groups.values())
@@ -0,0 +1,127 @@
+"""Tests and a benchmark for the coordinator's IoT device record index."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.const import Platform
+
+from custom_components.ha_ecowitt_iot.binary_sensor import (
+    IOT_BINARYSENSOR_DESCRIPTIONS,
+    IotDeviceBinarySensor,
+)
+from custom_components.ha_ecowitt_iot.coordinator import _iot_records
+from custom_components.ha_ecowitt_iot.entity_table import KeyRoute, _description
+from custom_components.ha_ecowitt_iot.switch import SWITCH_DESCRIPTIONS, EcowittSwitch
+
+RUNNING = next(
+    desc for desc in IOT_BINARYSENSOR_DESCRIPTIONS if desc.key == "iot_running"
+)
+BINARY_ROUTE = KeyRoute(Platform.BINARY_SENSOR, IotDeviceBinarySensor, RUNNING)
+
+
+class _Record(dict):
+    """An IoT device record that counts reads of its fields."""
+
+    reads = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        _Record.reads += 1
+        return super().get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        _Record.reads += 1
+        return super().__getitem__(key)
+
+
+def _payload(devices: int) -> dict[str, Any]:
+    return {
+        "iot_list": {
+            "command": [
+                _Record(
+                    nickname=f"back_yard_{index}",
+                    id=1000 + index,
+                    model=1,
+                    rfnet_state=1,
+                    iot_running=index % 2,
+                )
+                for index in range(devices)
+            ]
+        }
+    }
+
+
+def _coordinator(payload: dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(
+        data=payload,
+        iot_by_nickname=_iot_records(payload),
+        iot_by_id=_iot_records(payload, "id"),
+        device_info=lambda device_id=None: None,
+    )
+
+
+def _entities(coordinator: SimpleNamespace, devices: int) -> list:
+    entities = []
+    for index in range(devices):
+        nickname = f"back_yard_{index}"
+        key = f"{nickname}_iot_running"
+        entities.append(
+            IotDeviceBinarySensor(
+                coordinator, nickname, _description(BINARY_ROUTE, key), key
+            )
+        )
+        entities.append(
+            EcowittSwitch(coordinator, nickname, SWITCH_DESCRIPTIONS[0], key)
+        )
+    return entities
+
+
+def test_records_are_indexed_by_nickname_and_id() -> None:
+    payload = _payload(3)
+    payload["iot_list"]["command"].append({"nickname": "back_yard_1", "id": 7})
+
+    by_nickname = _iot_records(payload)
+    by_id = _iot_records(payload, "id")
+
+    # The first record wins on a duplicate nickname.
+    assert by_nickname["back_yard_1"]["id"] == 1001
+    assert by_id[1002]["nickname"] == "back_yard_2"
+    assert _iot_records({"iot_list": None}) == {}
+
+
+def test_entities_resolve_nicknames_with_underscores() -> None:
+    coordinator = _coordinator(_payload(4))
+    binary, switch = _entities(coordinator, 4)[2:4]
+
+    assert binary.is_on == 1
+    assert switch.is_on is True
+
+
+def _record_reads_per_entity(devices: int) -> float:
+    payload = _payload(devices)
+    coordinator = _coordinator(payload)
+    entities = _entities(coordinator, devices)
+    _Record.reads = 0
+    # One poll: rebuild the index, then every entity reads its state.
+    coordinator.iot_by_nickname = _iot_records(payload)
+    coordinator.iot_by_id = _iot_records(payload, "id")
+    for entity in entities:
+        entity.is_on
+    return _Record.reads / len(entities)
+
+
+def test_per_poll_cost_per_entity_stays_flat() -> None:
+    """Benchmark: a 40x larger gateway reads as many records per entity.
+
+    Scanning iot_list per property read made the records read per entity
+    grow linearly with the number of IoT devices.
+    """
+    small = _record_reads_per_entity(10)
+    large = _record_reads_per_entity(400)
+
+    print(
+        f"\nrecord reads per entity per poll: 10 devices {small:.1f}, "
+        f"400 devices {large:.1f}"
+    )
+    assert large == small
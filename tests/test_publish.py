@@ -0,0 +1,42 @@
+"""Tests for the recorder write budget."""
+
+from __future__ import annotations
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from custom_components.ha_ecowitt_iot.publish import (
+    PUBLISH_MAX_DEFER_SECONDS,
+    PublishGate,
+    publish_rule,
+)
+
+
+def _temperature_gate(value: float) -> PublishGate:
+    gate = PublishGate(publish_rule("tempf", SensorDeviceClass.TEMPERATURE, None))
+    gate.record(value, True, 0.0)
+    return gate
+
+
+def test_single_step_is_written_despite_float_error() -> None:
+    # 72.3 - 72.2 == 0.09999999999999432
+    assert _temperature_gate(72.2).delay(72.3, True, 10.0) == 0.0
+
+
+def test_single_humidity_step_is_written() -> None:
+    gate = PublishGate(publish_rule("humidity", SensorDeviceClass.HUMIDITY, None))
+    gate.record("45", True, 0.0)
+    assert gate.delay("46", True, 10.0) == 0.0
+
+
+def test_change_below_one_step_waits_at_most_max_defer() -> None:
+    assert _temperature_gate(72.2).delay(72.25, True, 10.0) == (
+        PUBLISH_MAX_DEFER_SECONDS - 10.0
+    )
+
+
+def test_unchanged_value_is_not_written() -> None:
+    assert _temperature_gate(72.2).delay(72.2, True, 10.0) is None
+
+
+def test_availability_change_is_written_immediately() -> None:
+    assert _temperature_gate(72.2).delay(72.3, False, 10.0) == 0.0
@@ -0,0 +1,69 @@
+"""Tests for decoding gateway uploads."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from custom_components.ha_ecowitt_iot.push import decode_push_payload, upload_matches
+
+GATEWAY = SimpleNamespace(host="192.0.2.1", push_passkey="0123ABCD")
+
+
+def test_values_match_wittiot_representation() -> None:
+    decoded = decode_push_payload(
+        {
+            "tempf": "72.3",
+            "temp2f": "70.02",
+            "humidity": "45",
+            "humidity2": "51",
+            "winddir": "180",
+            "baromrelin": "29.921",
+            "maxdailygust": "8.05",
+            "lightning": "16",
+            "srain_piezo": "1",
+            "leak_ch1": "0",
+        }
+    )
+    assert decoded == {
+        "tempf": 72.3,
+        "temp_ch2": 70.0,
+        "humidity": "45",
+        "humidity_ch2": "51",
+        "winddir": "180",
+        "baromrelin": 29.92,
+        "daywindmax": 8.05,
+        "lightning": 9.9,
+        "srain_piezo": "Raining",
+        "leak_ch1": "Normal",
+    }
+
+
+def test_unconvertible_fields_are_dropped() -> None:
+    decoded = decode_push_payload(
+        {
+            "PASSKEY": "ABC",
+            "dateutc": "2024-05-01 12:00:00",
+            "lightning_time": "1714564800",
+            "wh65batt": "0",
+            "pm25_ch1": "12.0",
+            "tempinf": "--",
+        }
+    )
+    assert decoded == {}
+
+
+def test_dry_piezo_state() -> None:
+    assert decode_push_payload({"srain_piezo": "0"}) == {"srain_piezo": "No rain"}
+
+
+def test_passkey_decides_when_known() -> None:
+    assert upload_matches(GATEWAY, {"PASSKEY": "0123abcd"}, "192.0.2.9")
+    # The gateway's address does not make up for another device's PASSKEY.
+    assert not upload_matches(GATEWAY, {"PASSKEY": "FFFF"}, "192.0.2.1")
+
+
+def test_address_decides_without_passkey() -> None:
+    assert upload_matches(GATEWAY, {}, "192.0.2.1")
+    assert not upload_matches(GATEWAY, {}, "192.0.2.9")
+    by_hostname = SimpleNamespace(host="gw2000a.local", push_passkey=None)
+    assert not upload_matches(by_hostname, {"PASSKEY": "0123ABCD"}, "192.0.2.1")
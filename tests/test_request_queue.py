@@ -0,0 +1,100 @@
+"""Tests for the per-gateway request queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.ha_ecowitt_iot.request_queue import (
+    PRIORITY_CONTROL,
+    GatewayRequestQueue,
+)
+
+
+def _request(calls: list[str], name: str, delay: float = 0.01):
+    async def _run() -> str:
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return name
+
+    return _run
+
+
+async def test_runs_one_request_at_a_time_by_priority() -> None:
+    queue = GatewayRequestQueue()
+    calls: list[str] = []
+    first = asyncio.create_task(queue.async_call(_request(calls, "first")))
+    await asyncio.sleep(0)
+    read = asyncio.create_task(queue.async_call(_request(calls, "read")))
+    control = asyncio.create_task(
+        queue.async_call(_request(calls, "control"), priority=PRIORITY_CONTROL)
+    )
+    await asyncio.gather(first, read, control)
+    assert calls == ["first", "control", "read"]
+
+
+async def test_waiting_reads_are_merged() -> None:
+    queue = GatewayRequestQueue()
+    calls: list[str] = []
+    busy = asyncio.create_task(queue.async_call(_request(calls, "busy")))
+    await asyncio.sleep(0)
+    reads = [
+        asyncio.create_task(queue.async_call(_request(calls, "read"), merge_key="a"))
+        for _ in range(5)
+    ]
+    assert await asyncio.gather(*reads) == ["read"] * 5
+    await busy
+    assert calls == ["busy", "read"]
+    assert queue.merged == 4
+
+
+async def test_merged_reader_survives_cancelled_owner() -> None:
+    queue = GatewayRequestQueue()
+    calls: list[str] = []
+    busy = asyncio.create_task(queue.async_call(_request(calls, "busy", 0.1)))
+    await asyncio.sleep(0)
+    owner = asyncio.create_task(
+        asyncio.wait_for(
+            queue.async_call(_request(calls, "read"), merge_key="a"), 0.02
+        )
+    )
+    await asyncio.sleep(0)
+    merged = asyncio.create_task(
+        queue.async_call(_request(calls, "read"), merge_key="a")
+    )
+    with pytest.raises(asyncio.TimeoutError):
+        await owner
+    assert await merged == "read"
+    await busy
+
+
+async def test_abandoned_requests_do_not_run() -> None:
+    queue = GatewayRequestQueue()
+    calls: list[str] = []
+    busy = asyncio.create_task(queue.async_call(_request(calls, "busy", 0.05)))
+    await asyncio.sleep(0)
+    dropped = asyncio.create_task(queue.async_call(_request(calls, "dropped")))
+    await asyncio.sleep(0)
+    dropped.cancel()
+    await busy
+    assert await queue.async_call(_request(calls, "next")) == "next"
+    assert calls == ["busy", "next"]
+    assert queue.depth == 0
+
+
+async def test_errors_reach_every_merged_caller() -> None:
+    queue = GatewayRequestQueue()
+
+    async def _fail() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    busy = asyncio.create_task(queue.async_call(_request([], "busy")))
+    await asyncio.sleep(0)
+    results = await asyncio.gather(
+        *(queue.async_call(_fail, merge_key="a") for _ in range(3)),
+        return_exceptions=True,
+    )
+    await busy
+    assert all(isinstance(result, ValueError) for result in results)
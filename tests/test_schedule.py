@@ -0,0 +1,57 @@
+"""Tests for aiming the coordinator's refresh at its scheduled slot."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from custom_components.ha_ecowitt_iot.coordinator import EcowittDataUpdateCoordinator
+
+
+class _Loop:
+    def __init__(self, now: float) -> None:
+        self.now = now
+        self.fire_at: float | None = None
+
+    def time(self) -> float:
+        return self.now
+
+    def call_at(self, when: float, *args):
+        self.fire_at = when
+        return MagicMock()
+
+
+def _coordinator(now: float, microsecond: float) -> EcowittDataUpdateCoordinator:
+    coordinator = object.__new__(EcowittDataUpdateCoordinator)
+    coordinator.hass = MagicMock()
+    coordinator.hass.loop = _Loop(now)
+    coordinator.config_entry = None
+    coordinator._microsecond = microsecond
+    coordinator._unsub_refresh = None
+    coordinator._job = MagicMock()
+    coordinator.update_interval = None
+    return coordinator
+
+
+def test_refresh_fires_at_slot_despite_truncation() -> None:
+    """The base class's whole-second rounding and jitter are compensated."""
+    for now, microsecond, delay in (
+        (100.9, 0.05, 7.3),
+        (100.1, 0.5, 10.0),
+        (100.75, 0.3, 0.4),
+    ):
+        coordinator = _coordinator(now, microsecond)
+        coordinator._next_poll_at = now + delay
+
+        coordinator._schedule_refresh()
+
+        assert abs(coordinator.hass.loop.fire_at - (now + delay)) < 1e-9
+
+
+def test_stale_slot_keeps_interval() -> None:
+    """A slot already in the past does not trigger an immediate poll."""
+    coordinator = _coordinator(200.4, 0.2)
+    coordinator._next_poll_at = 150.0
+    coordinator.update_interval = timedelta(seconds=10)
+
+    coordinator._schedule_refresh()
+
+    assert coordinator.hass.loop.fire_at == 200 + 0.2 + 10
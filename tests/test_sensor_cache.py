@@ -0,0 +1,97 @@
+"""Tests and a benchmark for the sensors' per-generation derived values."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+)
+
+from custom_components.ha_ecowitt_iot.sensor import MainDevEcowittSensor
+
+ENTITIES = 500
+
+
+class _CountingPayload(dict):
+    """Coordinator data that counts the sensors' reads of their raw value."""
+
+    reads = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self.reads += 1
+        return super().get(key, default)
+
+
+def _coordinator() -> SimpleNamespace:
+    return SimpleNamespace(
+        data=_CountingPayload(
+            {f"batt{index}": index % 6 for index in range(ENTITIES)}
+        ),
+        generation=0,
+        last_update_success=True,
+        device_info=lambda device_id=None: None,
+    )
+
+
+def _entities(coordinator: SimpleNamespace) -> list[MainDevEcowittSensor]:
+    return [
+        MainDevEcowittSensor(
+            coordinator,
+            "GW2000A",
+            SensorEntityDescription(
+                key=f"batt{index}", device_class=SensorDeviceClass.BATTERY
+            ),
+        )
+        for index in range(ENTITIES)
+    ]
+
+
+def _write_states(entities: list[MainDevEcowittSensor]) -> None:
+    """Read what HA reads on every state write."""
+    for entity in entities:
+        entity.native_value
+        entity.extra_state_attributes
+        entity.icon
+        entity.available
+
+
+def test_derived_values_follow_the_generation() -> None:
+    coordinator = _coordinator()
+    entity = _entities(coordinator)[0]
+
+    assert entity.native_value == 0
+    assert entity.icon == "mdi:battery-outline"
+
+    coordinator.data["batt0"] = "DC"
+    # Same generation: the cached value is still served.
+    assert entity.native_value == 0
+    coordinator.generation += 1
+    assert entity.native_value == 100
+    assert entity.extra_state_attributes == {"power_source": "DC"}
+    assert entity.icon == "mdi:power-plug"
+
+
+def test_state_writes_derive_once_per_generation() -> None:
+    """Benchmark: 500 state writes read each sensor's raw value once.
+
+    Before the cache, native_value, extra_state_attributes and icon each
+    derived the value from the payload: three reads per sensor and write.
+    """
+    coordinator = _coordinator()
+    entities = _entities(coordinator)
+    payload = coordinator.data
+
+    _write_states(entities)
+    assert payload.reads == ENTITIES
+
+    # Writes within one generation (a deferred publish, a second listener)
+    # are served from the cache.
+    _write_states(entities)
+    assert payload.reads == ENTITIES
+
+    coordinator.generation += 1
+    _write_states(entities)
+    assert payload.reads == 2 * ENTITIES